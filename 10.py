@@ -1,24 +1,81 @@
 import pygame
+import copy
+import csv
+import os
 import random
+import struct
 import sys
+import time
+from collections import deque
 
 # --- Initialization ---
 pygame.init()
 
+# Imported (bots, training) or --bench-env: simulate only, never open a window
+HEADLESS = __name__ != "__main__" or "--bench-env" in sys.argv or "--replay" in sys.argv
+
 # --- Full Screen Setup ---
-info = pygame.display.Info()
-SCREEN_WIDTH = info.current_w
-SCREEN_HEIGHT = info.current_h
-flags = pygame.FULLSCREEN | pygame.DOUBLEBUF
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), flags)
-pygame.display.set_caption("Pixel Highway: OG Edition")
+if HEADLESS:
+    SCREEN_WIDTH, SCREEN_HEIGHT = 1920, 1080
+    screen = None
+else:
+    info = pygame.display.Info()
+    SCREEN_WIDTH = info.current_w
+    SCREEN_HEIGHT = info.current_h
+    flags = pygame.FULLSCREEN | pygame.DOUBLEBUF
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), flags)
+    pygame.display.set_caption("Pixel Highway: OG Edition")
 clock = pygame.time.Clock()
 
 # --- Configuration ---
 FPS = 60
-BLOCK_SIZE = 4 
+# --lowres draws the scene one block per pixel into a ~INTERNAL_HEIGHT-row surface and
+# integer-upscales it, so fill cost no longer grows with the monitor resolution.
+LOW_RES = "--lowres" in sys.argv
+INTERNAL_HEIGHT = 270
+BLOCK_SIZE = max(1, SCREEN_HEIGHT // INTERNAL_HEIGHT) if LOW_RES else 4
 CAR_WIDTH = 14 * BLOCK_SIZE  # Slightly wider for OG look
 CAR_HEIGHT = 24 * BLOCK_SIZE
+MAX_ENEMIES = 256
+SAFE_DISTANCE = 300          # No spawn while a car in a neighbouring lane is above this y
+PLAYER_SPEED = 12
+BASE_SPEED = 10
+
+# --- Simulation API ---
+ACTION_LEFT = 1              # Actions are bitfields of held steering keys
+ACTION_RIGHT = 2
+REWARD_PASS = 1.0            # Per enemy that gets past the player
+REWARD_HIT = -10.0           # Per crash
+OBS_LANES = 8                # Road slices in the observation's distance sensor
+VEC_ENEMIES = 32             # Enemy slots per game in VectorRacer
+
+# --- Frame Pacing ---
+SIM_DT = 1 / 60              # RacerSim.step() is one tick of this length, whatever the frame rate
+MAX_CATCHUP = 5              # Sim steps per frame at most; beyond that the game slows down
+PACE_WINDOW = 120            # Frames kept for the frame-time percentiles
+PACE_EVERY = 30              # Frames between quality decisions
+PACE_HIGH = 0.9              # Shed an effect when p95 work time exceeds this share of the budget
+PACE_LOW = 0.5               # Restore one when it drops below this share
+
+def arg_value(flag):
+    return sys.argv[sys.argv.index(flag) + 1] if flag in sys.argv[:-1] else None
+
+# --pace-log PATH writes per-frame timings as CSV
+PACE_LOG = arg_value("--pace-log")
+
+# --- Replays ---
+# --record PATH saves each run; --ghost PATH races a replay's car on its seed;
+# --replay PATH re-simulates one headless and checks its final score
+RECORD_PATH = arg_value("--record")
+GHOST_PATH = arg_value("--ghost")
+REPLAY_PATH = arg_value("--replay")
+REPLAY_MAGIC = b"RRPL"
+REPLAY_VERSION = 2
+# magic, version, seed, width, height, block size (sets the car hitboxes), steps, final score, final lives
+REPLAY_HEADER = struct.Struct("<4sBQHHBIIB")
+REPLAY_RUN = 64              # An input run byte holds the action in 2 bits and length-1 in 6
+SNAPSHOT_EVERY = 600         # Sim steps between in-memory seek snapshots (10 s)
+GHOST_ALPHA = 110
 
 # --- Colors ---
 C_ASPHALT = (40, 40, 50)     # Lighter asphalt for better contrast
@@ -41,34 +98,654 @@ def draw_text_centered(text, font, color, y_offset=0):
     rect = surface.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + y_offset))
     screen.blit(surface, rect)
 
-def draw_og_car(x, y, body_color):
+def render_og_car(surface, x, y, body_color, block=BLOCK_SIZE):
     """
-    Draws a classic boxy 'Sedan' style car.
+    Draws a classic boxy 'Sedan' style car with rects (used to build the sprite cache).
     """
+    car_w = 14 * block
+    car_h = 24 * block
     # 1. Tires (Tucked slightly inside)
-    tire_w = 3 * BLOCK_SIZE
-    tire_h = 5 * BLOCK_SIZE
+    tire_w = 3 * block
+    tire_h = 5 * block
     # Left tires
-    pygame.draw.rect(screen, C_TIRE, (x + BLOCK_SIZE, y + 3*BLOCK_SIZE, tire_w, tire_h))
-    pygame.draw.rect(screen, C_TIRE, (x + BLOCK_SIZE, y + CAR_HEIGHT - 7*BLOCK_SIZE, tire_w, tire_h))
+    pygame.draw.rect(surface, C_TIRE, (x + block, y + 3*block, tire_w, tire_h))
+    pygame.draw.rect(surface, C_TIRE, (x + block, y + car_h - 7*block, tire_w, tire_h))
     # Right tires
-    pygame.draw.rect(screen, C_TIRE, (x + CAR_WIDTH - tire_w - BLOCK_SIZE, y + 3*BLOCK_SIZE, tire_w, tire_h))
-    pygame.draw.rect(screen, C_TIRE, (x + CAR_WIDTH - tire_w - BLOCK_SIZE, y + CAR_HEIGHT - 7*BLOCK_SIZE, tire_w, tire_h))
+    pygame.draw.rect(surface, C_TIRE, (x + car_w - tire_w - block, y + 3*block, tire_w, tire_h))
+    pygame.draw.rect(surface, C_TIRE, (x + car_w - tire_w - block, y + car_h - 7*block, tire_w, tire_h))
 
     # 2. Main Chassis (The big rectangle)
-    pygame.draw.rect(screen, body_color, (x + 2*BLOCK_SIZE, y, CAR_WIDTH - 4*BLOCK_SIZE, CAR_HEIGHT))
+    pygame.draw.rect(surface, body_color, (x + 2*block, y, car_w - 4*block, car_h))
 
     # 3. Roof (The Center Box)
-    roof_offset = 6 * BLOCK_SIZE
-    roof_height = 10 * BLOCK_SIZE
-    pygame.draw.rect(screen, (min(body_color[0]+20, 255), min(body_color[1]+20, 255), min(body_color[2]+20, 255)), 
-                     (x + 3*BLOCK_SIZE, y + roof_offset, CAR_WIDTH - 6*BLOCK_SIZE, roof_height))
+    roof_offset = 6 * block
+    roof_height = 10 * block
+    pygame.draw.rect(surface, (min(body_color[0]+20, 255), min(body_color[1]+20, 255), min(body_color[2]+20, 255)), 
+                     (x + 3*block, y + roof_offset, car_w - 6*block, roof_height))
 
     # 4. Windshield (Front Glass)
-    pygame.draw.rect(screen, C_WINDSHIELD, (x + 3.5*BLOCK_SIZE, y + roof_offset + BLOCK_SIZE, CAR_WIDTH - 7*BLOCK_SIZE, 2*BLOCK_SIZE))
+    pygame.draw.rect(surface, C_WINDSHIELD, (x + 3.5*block, y + roof_offset + block, car_w - 7*block, 2*block))
     
     # 5. Rear Window (Back Glass)
-    pygame.draw.rect(screen, C_WINDSHIELD, (x + 3.5*BLOCK_SIZE, y + roof_offset + roof_height - 3*BLOCK_SIZE, CAR_WIDTH - 7*BLOCK_SIZE, 2*BLOCK_SIZE))
+    pygame.draw.rect(surface, C_WINDSHIELD, (x + 3.5*block, y + roof_offset + roof_height - 3*block, car_w - 7*block, 2*block))
+
+# --- Car Sprite Cache ---
+# Each (body color, block size) is rasterized once, with a soft drop shadow in C_ROOF,
+# into a per-pixel alpha surface; drawing a car is then a single blit.
+_car_sprites = {}
+
+def get_car_sprite(body_color, block=BLOCK_SIZE, alpha=255):
+    key = (tuple(body_color), block, alpha)
+    sprite = _car_sprites.get(key)
+    if sprite is None:
+        car_w = 14 * block
+        car_h = 24 * block
+        sprite = pygame.Surface((car_w + block, car_h + block), pygame.SRCALPHA)
+        # shadow: chassis footprint offset by one block, drawn behind the car
+        pygame.draw.rect(sprite, C_ROOF, (3*block, block, car_w - 4*block, car_h))
+        render_og_car(sprite, 0, 0, body_color, block)
+        sprite = _car_sprites[key] = sprite.convert_alpha()
+        if alpha < 255:
+            sprite.set_alpha(alpha)
+    return sprite
+
+def draw_og_car(x, y, body_color):
+    """
+    Draws a classic boxy 'Sedan' style car (one blit from the sprite cache).
+    """
+    screen.blit(get_car_sprite(body_color), (x, y))
+
+# --- Enemy Pool ---
+class EnemyPool:
+    """
+    Fixed-capacity enemy store. Slots are parallel lists recycled through a free list, and
+    each live enemy sits in the bucket of the car-width lane its left edge is in, so spawn
+    checks and collisions only look at neighbouring lanes. No dicts, Rects or list copies
+    are created per frame, however many enemies are on the road.
+    """
+    def __init__(self, road_left, lane_width, capacity=MAX_ENEMIES, block=BLOCK_SIZE):
+        self.road_left = road_left
+        self.car_width = 14 * block
+        self.car_height = 24 * block
+        self.x = [0] * capacity
+        self.y = [0] * capacity
+        self.color = [C_RED] * capacity
+        self.lane = [0] * capacity
+        self.slot_in_lane = [0] * capacity
+        self.slot_in_active = [0] * capacity
+        self.free = list(range(capacity - 1, -1, -1))
+        self.active = []
+        self.lanes = [[] for _ in range(lane_width // self.car_width + 1)]
+
+    def lane_of(self, x):
+        return min(max((x - self.road_left) // self.car_width, 0), len(self.lanes) - 1)
+
+    def is_clear(self, x):
+        """
+        True if no enemy that could overlap a car at x is still above SAFE_DISTANCE.
+        """
+        y = self.y
+        lane = self.lane_of(x)
+        for l in range(max(lane - 1, 0), min(lane + 2, len(self.lanes))):
+            for i in self.lanes[l]:
+                if y[i] < SAFE_DISTANCE:
+                    return False
+        return True
+
+    def spawn(self, x, y, color=C_RED):
+        if not self.free:
+            return -1
+        i = self.free.pop()
+        self.x[i] = x
+        self.y[i] = y
+        self.color[i] = color
+        lane = self.lane[i] = self.lane_of(x)
+        bucket = self.lanes[lane]
+        self.slot_in_lane[i] = len(bucket)
+        bucket.append(i)
+        self.slot_in_active[i] = len(self.active)
+        self.active.append(i)
+        return i
+
+    def release(self, i):
+        # Swap-remove from both the active list and the lane bucket
+        last = self.active.pop()
+        if last != i:
+            self.active[self.slot_in_active[i]] = last
+            self.slot_in_active[last] = self.slot_in_active[i]
+        bucket = self.lanes[self.lane[i]]
+        last = bucket.pop()
+        if last != i:
+            bucket[self.slot_in_lane[i]] = last
+            self.slot_in_lane[last] = self.slot_in_lane[i]
+        self.free.append(i)
+
+    def advance(self, dy, bottom):
+        """
+        Moves every enemy down by dy and releases those past bottom. Returns how many passed.
+        """
+        y = self.y
+        active = self.active
+        passed = 0
+        for k in range(len(active) - 1, -1, -1):
+            i = active[k]
+            y[i] += dy
+            if y[i] > bottom:
+                self.release(i)
+                passed += 1
+        return passed
+
+    def collide(self, px, py):
+        """
+        Releases the first enemy whose hitbox (inset 4px) overlaps a car at (px, py); returns its slot or -1.
+        """
+        x, y = self.x, self.y
+        reach_x = self.car_width - 8
+        reach_y = self.car_height - 8
+        lane = self.lane_of(px)
+        for l in range(max(lane - 1, 0), min(lane + 2, len(self.lanes))):
+            for i in self.lanes[l]:
+                if -reach_x < x[i] - px < reach_x and -reach_y < y[i] - py < reach_y:
+                    self.release(i)
+                    return i
+        return -1
+
+# --- Simulation Core ---
+class RacerSim:
+    """
+    One race without input, drawing or frame pacing. step() applies one frame of the game
+    rules for an action bitfield; all randomness comes from a seeded random.Random, so a
+    seed plus the sequence of actions reproduces a run exactly (at the same size and block,
+    which sets the car hitboxes).
+    """
+    def __init__(self, seed=None, width=SCREEN_WIDTH, height=SCREEN_HEIGHT, block=BLOCK_SIZE):
+        self.width = width
+        self.height = height
+        self.block = block
+        self.car_width = 14 * block
+        self.car_height = 24 * block
+        self.road_left = width // 4
+        self.road_right = width - (width // 4)
+        self.lane_width = self.road_right - self.road_left
+        self.player_y = height - self.car_height - 50
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.player_x = self.width // 2 - self.car_width // 2
+        self.score = 0
+        self.lives = 3
+        self.game_speed = BASE_SPEED
+        self.marker_y = 0    # Visual offset of the lane markers, synced with game speed
+        self.shake_timer = 0
+        self.frame = 0
+        self.enemies = EnemyPool(self.road_left, self.lane_width, block=self.block)
+        return self.observation()
+
+    @property
+    def done(self):
+        return self.lives <= 0
+
+    STATE = ("player_x", "score", "lives", "game_speed", "marker_y", "shake_timer", "frame")
+
+    def snapshot(self):
+        """
+        Everything step() depends on, including the RNG state and the exact pool layout.
+        """
+        return ([getattr(self, name) for name in self.STATE], self.rng.getstate(), copy.deepcopy(self.enemies))
+
+    def restore(self, state):
+        values, rng_state, enemies = state
+        for name, value in zip(self.STATE, values):
+            setattr(self, name, value)
+        self.rng.setstate(rng_state)
+        self.enemies = copy.deepcopy(enemies)
+
+    def step(self, action):
+        """
+        Advances one frame and returns the reward earned in it.
+        """
+        if self.shake_timer > 0:
+            self.shake_timer -= 1
+        if action & ACTION_LEFT and self.player_x > self.road_left + 10:
+            self.player_x -= PLAYER_SPEED
+        if action & ACTION_RIGHT and self.player_x < self.road_right - self.car_width - 10:
+            self.player_x += PLAYER_SPEED
+
+        # Increase Speed based on Score (Dino Style)
+        self.game_speed = BASE_SPEED + (self.score // 5)
+        self.marker_y += self.game_speed
+        if self.marker_y >= 100: # Reset after one "segment" length
+            self.marker_y = 0
+
+        # Spawn Enemies
+        enemies = self.enemies
+        if self.rng.randint(0, 100) < 2 + (self.score // 10):
+            spawn_x = self.rng.randint(self.road_left + 20, self.road_right - self.car_width - 20)
+            if enemies.is_clear(spawn_x): # Increased safe distance so they don't clump
+                enemies.spawn(spawn_x, -150) # Spawn higher up
+
+        # Move Enemies (EXACT same speed as road markers); the ones that got past score
+        passed = enemies.advance(self.game_speed, self.height)
+        self.score += passed
+
+        # Collision Detection
+        hits = 0
+        while self.lives > 0 and enemies.collide(self.player_x, self.player_y) >= 0:
+            self.lives -= 1
+            hits += 1
+            self.shake_timer = 20 # Stronger shake
+        self.frame += 1
+        return passed * REWARD_PASS + hits * REWARD_HIT
+
+    def observation(self):
+        """
+        [position across the road 0..1, speed / BASE_SPEED, lives] followed by, for each of
+        OBS_LANES road slices, the gap to the nearest car ahead as a fraction of the screen
+        height (1.0 when the slice is clear).
+        """
+        obs = [(self.player_x - self.road_left) / self.lane_width, self.game_speed / BASE_SPEED, self.lives]
+        obs.extend([1.0] * OBS_LANES)
+        enemies = self.enemies
+        for i in enemies.active:
+            y = enemies.y[i]
+            if y < self.player_y + self.car_height:
+                lane = (enemies.x[i] + self.car_width // 2 - self.road_left) * OBS_LANES // self.lane_width
+                slot = 3 + min(max(lane, 0), OBS_LANES - 1)
+                gap = max(self.player_y - y - self.car_height, 0) / self.height
+                if gap < obs[slot]:
+                    obs[slot] = gap
+        return obs
+
+class VectorRacer:
+    """
+    N independent races stepped in lockstep with NumPy arrays; same rules, rewards and
+    observation layout as RacerSim. Finished games are reset automatically inside step(); call
+    observation() once per step when it is needed.
+    """
+    def __init__(self, n, seed=None, capacity=VEC_ENEMIES, width=SCREEN_WIDTH, height=SCREEN_HEIGHT):
+        import numpy as np
+        self.np = np
+        self.n = n
+        self.width = width
+        self.height = height
+        self.road_left = width // 4
+        self.road_right = width - (width // 4)
+        self.lane_width = self.road_right - self.road_left
+        self.lane_count = self.lane_width // CAR_WIDTH + 1
+        self.player_y = height - CAR_HEIGHT - 50
+        self.rng = np.random.default_rng(seed)
+        self.rows = np.arange(n)
+        self.player_x = np.zeros(n, np.int32)
+        self.score = np.zeros(n, np.int32)
+        self.lives = np.zeros(n, np.int32)
+        self.shake_timer = np.zeros(n, np.int32)
+        self.marker_y = np.zeros(n, np.int32)
+        self.ex = np.zeros((n, capacity), np.int32)
+        self.ey = np.zeros((n, capacity), np.int32)
+        self.lane = np.zeros((n, capacity), np.int32)
+        self.alive = np.zeros((n, capacity), bool)
+        self.reset()
+
+    def reset(self):
+        self.reset_games(slice(None))
+        return self.observation()
+
+    def reset_games(self, mask):
+        """
+        Restarts the games selected by mask without building an observation.
+        """
+        self.player_x[mask] = self.width // 2 - CAR_WIDTH // 2
+        self.score[mask] = 0
+        self.lives[mask] = 3
+        self.shake_timer[mask] = 0
+        self.marker_y[mask] = 0
+        self.alive[mask] = False
+
+    def step(self, actions):
+        """
+        Advances every game one frame. Returns (rewards, dones) arrays.
+        """
+        np = self.np
+        actions = np.asarray(actions)
+        np.maximum(self.shake_timer - 1, 0, out=self.shake_timer)
+        px = self.player_x
+        px -= PLAYER_SPEED * (((actions & ACTION_LEFT) != 0) & (px > self.road_left + 10))
+        px += PLAYER_SPEED * (((actions & ACTION_RIGHT) != 0) & (px < self.road_right - CAR_WIDTH - 10))
+
+        speed = BASE_SPEED + self.score // 5
+        self.marker_y += speed
+        self.marker_y[self.marker_y >= 100] = 0
+
+        # Spawn into the first free slot where the neighbouring lanes are clear
+        alive, ey = self.alive, self.ey
+        spawn_x = self.rng.integers(self.road_left + 20, self.road_right - CAR_WIDTH - 20, self.n, endpoint=True)
+        spawn_lane = np.clip((spawn_x - self.road_left) // CAR_WIDTH, 0, self.lane_count - 1)
+        blocked = (alive & (np.abs(self.lane - spawn_lane[:, None]) <= 1) & (ey < SAFE_DISTANCE)).any(axis=1)
+        slot = (~alive).argmax(axis=1)
+        spawn = (self.rng.integers(0, 100, self.n, endpoint=True) < 2 + self.score // 10) & ~blocked & ~alive[self.rows, slot]
+        rows, slot = self.rows[spawn], slot[spawn]
+        self.ex[rows, slot] = spawn_x[spawn]
+        ey[rows, slot] = -150
+        self.lane[rows, slot] = spawn_lane[spawn]
+        alive[rows, slot] = True
+
+        ey += speed[:, None]
+        passed = alive & (ey > self.height)
+        alive &= ~passed
+        passed = passed.sum(axis=1)
+        self.score += passed
+
+        hit = (alive & (np.abs(self.ex - px[:, None]) < CAR_WIDTH - 8)
+               & (np.abs(ey - self.player_y) < CAR_HEIGHT - 8))
+        alive &= ~hit
+        hits = np.minimum(hit.sum(axis=1), self.lives)
+        self.lives -= hits
+        self.shake_timer[hits > 0] = 20
+
+        rewards = passed * REWARD_PASS + hits * REWARD_HIT
+        dones = self.lives <= 0
+        if dones.any():
+            self.reset_games(dones)
+        return rewards, dones
+
+    def observation(self):
+        np = self.np
+        obs = np.ones((self.n, 3 + OBS_LANES), np.float32)
+        obs[:, 0] = (self.player_x - self.road_left) / self.lane_width
+        obs[:, 1] = (BASE_SPEED + self.score // 5) / BASE_SPEED
+        obs[:, 2] = self.lives
+        ahead = self.alive & (self.ey < self.player_y + CAR_HEIGHT)
+        gap = np.where(ahead, np.maximum(self.player_y - self.ey - CAR_HEIGHT, 0) / self.height, 1.0)
+        lane = np.clip((self.ex + CAR_WIDTH // 2 - self.road_left) * OBS_LANES // self.lane_width, 0, OBS_LANES - 1)
+        for l in range(OBS_LANES):
+            obs[:, 3 + l] = np.where(lane == l, gap, 1.0).min(axis=1)
+        return obs
+
+# --- Replays ---
+class Replay:
+    """
+    A seeded run as its per-step action bitfields. On disk: REPLAY_HEADER, then run-length
+    bytes (action | (length - 1) << 2), so steady driving costs about one byte per second.
+    """
+    def __init__(self, seed, width=SCREEN_WIDTH, height=SCREEN_HEIGHT, block=BLOCK_SIZE, actions=None,
+                 score=0, lives=0):
+        self.seed = seed
+        self.width = width
+        self.height = height
+        self.block = block
+        self.actions = actions if actions is not None else bytearray()
+        self.score = score
+        self.lives = lives
+
+    def save(self, path):
+        runs = bytearray()
+        actions = self.actions
+        i = 0
+        while i < len(actions):
+            action = actions[i]
+            j = i + 1
+            while j < len(actions) and actions[j] == action and j - i < REPLAY_RUN:
+                j += 1
+            runs.append(action | (j - i - 1) << 2)
+            i = j
+        with open(path, "wb") as f:
+            f.write(REPLAY_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, self.seed, self.width, self.height,
+                                       self.block, len(actions), self.score, self.lives))
+            f.write(runs)
+        return REPLAY_HEADER.size + len(runs)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, seed, width, height, block, steps, score, lives = REPLAY_HEADER.unpack_from(data)
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            raise ValueError(f"{path} is not a version {REPLAY_VERSION} replay")
+        actions = bytearray()
+        for run in data[REPLAY_HEADER.size:]:
+            actions += bytes((run & 3,)) * ((run >> 2) + 1)
+        if len(actions) != steps:
+            raise ValueError(f"{path} is truncated: {len(actions)} of {steps} steps")
+        return cls(seed, width, height, block, actions, score, lives)
+
+class ReplayPlayer:
+    """
+    Re-simulates a Replay. Snapshots are kept every SNAPSHOT_EVERY steps as they are
+    reached, so seek() restores the nearest one and only steps forward from there.
+    """
+    def __init__(self, replay):
+        self.replay = replay
+        self.sim = RacerSim(replay.seed, replay.width, replay.height, replay.block)
+        self.snapshots = [self.sim.snapshot()]
+
+    @property
+    def finished(self):
+        return self.sim.frame >= len(self.replay.actions)
+
+    def advance(self):
+        sim = self.sim
+        if sim.frame < len(self.replay.actions):
+            sim.step(self.replay.actions[sim.frame])
+            if sim.frame == len(self.snapshots) * SNAPSHOT_EVERY:
+                self.snapshots.append(sim.snapshot())
+
+    def seek(self, frame):
+        frame = min(frame, len(self.replay.actions))
+        nearest = min(frame // SNAPSHOT_EVERY, len(self.snapshots) - 1)
+        if not nearest * SNAPSHOT_EVERY <= self.sim.frame <= frame:
+            self.sim.restore(self.snapshots[nearest])
+        while self.sim.frame < frame:
+            self.advance()
+        return self.sim
+
+    def run(self):
+        return self.seek(len(self.replay.actions))
+
+# --- Road Renderer ---
+class RoadRenderer:
+    """
+    Draws the race scene onto a target surface. Grass and asphalt are pre-rendered once,
+    the lane markers scroll as a tall tile blitted through a moving window, and on quiet
+    frames only the regions that changed (marker column, cars, HUD) are redrawn and presented.
+
+    Positions are always in screen pixels. With scale > 1 the target is a small internal
+    surface (one pixel per scale screen pixels) that present() upscales onto display.
+    """
+    def __init__(self, target, road_left, lane_width, scale=1, display=None):
+        self.target = target
+        self.scale = scale
+        self.block = max(1, BLOCK_SIZE // scale)
+        width, height = target.get_size()
+        self.height = height
+        self.background = pygame.Surface((width, height)).convert()
+        self.background.fill(C_GRASS)
+        self.background.fill(C_ASPHALT, (road_left // scale, 0, lane_width // scale, height))
+        # Marker tile is one segment taller than the screen so any scroll offset fits
+        self.marker_x = (SCREEN_WIDTH // 2 - 5) // scale
+        self.marker_w = max(1, 10 // scale)
+        self.markers = pygame.Surface((self.marker_w, height + 100 // scale + 1)).convert()
+        self.markers.fill(C_ASPHALT)
+        for i in range(self.markers.get_height() * scale // 100 + 1):
+            self.markers.fill(C_LINE, (0, i * 100 // scale, self.marker_w, 50 // scale))
+        self.marker_rect = pygame.Rect(self.marker_x, 0, self.marker_w, height)
+        # When the pacer sheds "markers" they stop scrolling and come baked into the
+        # background, so quiet frames neither blit nor present the marker column
+        self.still_background = self.background.copy()
+        self.still_background.blit(self.markers, self.marker_rect.topleft, (0, 0, self.marker_w, height))
+        self.scrolling = True
+        # Red hit flash, allocated once and reused
+        self.flash = pygame.Surface((width, height)).convert()
+        self.flash.set_alpha(100)
+        self.flash.fill(C_RED)
+        self.font = font_small if scale == 1 else pygame.font.SysFont("Consolas", max(8, 30 // scale))
+        self.hud_key = None
+        self.hud_surfs = []
+        self.hud_rects = []
+        self.overlay_key = None
+        self.overlay_surfs = []
+        self.drawn = []      # rects covered by cars this frame
+        self.previous = []   # rects covered by cars last frame, restored on the next one
+        self.updates = []
+        self.full = True
+        self.needs_full = True
+        # Upscaled frames land in a reused, centered subsurface of the display
+        self.display = display
+        if display is not None:
+            size = (width * scale, height * scale)
+            self.origin = ((display.get_width() - size[0]) // 2, (display.get_height() - size[1]) // 2)
+            display.fill(C_BLACK)
+            self.scaled = display.subsurface(pygame.Rect(self.origin, size))
+
+    def begin(self, scroll_y, offset_x=0, offset_y=0, effects=False, scroll_markers=True):
+        """
+        Starts a frame. Shaken or flashing frames (and the one after them) redraw everything,
+        as does the frame where the markers start or stop scrolling.
+        """
+        target = self.target
+        offset_x //= self.scale
+        offset_y //= self.scale
+        self.full = (effects or self.needs_full or offset_x or offset_y
+                     or scroll_markers != self.scrolling)
+        self.needs_full = effects
+        self.scrolling = scroll_markers
+        background = self.background if scroll_markers else self.still_background
+        self.previous, self.drawn = self.drawn, self.previous
+        self.drawn.clear()
+        self.updates.clear()
+        if self.full:
+            if offset_x or offset_y:
+                target.fill(C_GRASS)
+            target.blit(background, (offset_x, offset_y))
+        else:
+            for rect in self.previous:
+                target.blit(background, rect, rect)
+            self.updates.extend(self.previous)
+            if scroll_markers:
+                self.updates.append(self.marker_rect)
+        if scroll_markers:
+            target.blit(self.markers, (self.marker_x + offset_x, offset_y),
+                        (0, (100 - scroll_y) // self.scale, self.marker_w, self.height))
+
+    def draw_car(self, x, y, body_color, alpha=255):
+        sprite = get_car_sprite(body_color, self.block, alpha)
+        self.drawn.append(self.target.blit(sprite, (x // self.scale, y // self.scale)))
+
+    def draw_flash(self):
+        self.target.blit(self.flash, (0, 0))
+
+    def draw_hud(self, score, lives):
+        changed = (score, lives) != self.hud_key
+        if changed:
+            self.hud_key = (score, lives)
+            self.hud_surfs = [self.font.render(f"SCORE: {score}", True, C_WHITE),
+                              self.font.render(f"LIVES: {lives}", True, C_WHITE)]
+            if not self.full:
+                background = self.background if self.scrolling else self.still_background
+                for rect in self.hud_rects:
+                    self.target.blit(background, rect, rect)
+                self.updates.extend(self.hud_rects)
+        if changed or self.full:
+            self.hud_rects = [self.target.blit(surf, (50 // self.scale, (50 + 50 * i) // self.scale))
+                              for i, surf in enumerate(self.hud_surfs)]
+            self.updates.extend(self.hud_rects)
+
+    def draw_overlay(self, lines):
+        """
+        Debug text in the top-right corner; restored like a car on the next frame.
+        """
+        if lines != self.overlay_key:
+            self.overlay_key = lines
+            self.overlay_surfs = [self.font.render(line, True, C_LINE) for line in lines]
+        right = self.target.get_width() - 20 // self.scale
+        y = 20 // self.scale
+        for surf in self.overlay_surfs:
+            self.drawn.append(self.target.blit(surf, (right - surf.get_width(), y)))
+            y += surf.get_height()
+
+    def present(self):
+        if not self.full:
+            self.updates.extend(self.drawn)
+        if self.display is None:
+            if self.full:
+                pygame.display.flip()
+            else:
+                pygame.display.update(self.updates)
+        elif self.full:
+            pygame.transform.scale(self.target, self.scaled.get_size(), self.scaled)
+            pygame.display.flip()
+        else:
+            scale = self.scale
+            ox, oy = self.origin
+            shown = []
+            for rect in self.updates:
+                if rect.w and rect.h:
+                    dest = pygame.Rect(ox + rect.x * scale, oy + rect.y * scale, rect.w * scale, rect.h * scale)
+                    pygame.transform.scale(self.target.subsurface(rect), dest.size, self.display.subsurface(dest))
+                    shown.append(dest)
+            pygame.display.update(shown)
+
+# --- Frame Pacer ---
+class FramePacer:
+    """
+    Records per-frame work time (excluding the wait in clock.tick) and every PACE_EVERY
+    frames compares its 95th percentile with the frame budget. Over budget, the next costly
+    effect in EFFECTS is switched off; comfortably under, the last one switched off comes back.
+    """
+    EFFECTS = ("flash", "shake", "markers")   # Shed in this order, most expensive first
+
+    def __init__(self, fps=FPS, log_path=None):
+        self.budget_ms = 1000 / fps
+        self.work = deque(maxlen=PACE_WINDOW)
+        self.intervals = deque(maxlen=PACE_WINDOW)
+        self.frame = 0
+        self.shed = 0
+        self.p50 = self.p95 = self.p99 = 0.0
+        self.show = False
+        self.lines = ()
+        self.log = None
+        if log_path:
+            self.log_file = open(log_path, "w", newline="")
+            self.log = csv.writer(self.log_file)
+            self.log.writerow(("frame", "interval_ms", "work_ms", "sim_steps", "shed"))
+
+    def enabled(self, effect):
+        return self.EFFECTS.index(effect) >= self.shed
+
+    def record(self, interval_ms, work_ms, steps):
+        self.frame += 1
+        self.work.append(work_ms)
+        self.intervals.append(interval_ms)
+        if self.log:
+            self.log.writerow((self.frame, f"{interval_ms:.3f}", f"{work_ms:.3f}", steps, self.shed))
+        if self.frame % PACE_EVERY:
+            return
+        ordered = sorted(self.work)
+        last = len(ordered) - 1
+        self.p50, self.p95, self.p99 = (ordered[int(q * last)] for q in (0.5, 0.95, 0.99))
+        if self.p95 > self.budget_ms * PACE_HIGH and self.shed < len(self.EFFECTS):
+            self.shed += 1
+        elif self.p95 < self.budget_ms * PACE_LOW and self.shed > 0:
+            self.shed -= 1
+        fps = 1000 * len(self.intervals) / max(sum(self.intervals), 1)
+        self.lines = (f"{fps:5.1f} FPS",
+                      f"work p50 {self.p50:.1f} p95 {self.p95:.1f} p99 {self.p99:.1f} ms",
+                      "shed: " + (", ".join(self.EFFECTS[:self.shed]) or "none"))
+
+    def close(self):
+        if self.log:
+            self.log_file.close()
+            self.log = None
+
+def make_road_renderer(road_left, lane_width):
+    """
+    Renders at native resolution, or into a small internal surface with --lowres.
+    """
+    if not LOW_RES:
+        return RoadRenderer(screen, road_left, lane_width)
+    internal = pygame.Surface((SCREEN_WIDTH // BLOCK_SIZE, SCREEN_HEIGHT // BLOCK_SIZE)).convert()
+    return RoadRenderer(internal, road_left, lane_width, scale=BLOCK_SIZE, display=screen)
 
 def intro_screen():
     waiting = True
@@ -82,7 +759,7 @@ def intro_screen():
         if (pulse // 30) % 2 == 0:
             draw_text_centered("PRESS SPACE TO START", font_small, C_WHITE, 50)
         
-        draw_text_centered("ARROWS to Steer | ESC to Quit", font_small, C_LINE, 150)
+        draw_text_centered("ARROWS to Steer | F3 Stats | ESC to Quit", font_small, C_LINE, 150)
         pygame.display.flip()
         
         for event in pygame.event.get():
@@ -94,31 +771,25 @@ def intro_screen():
                 if event.key == pygame.K_SPACE:
                     waiting = False
 
-def main_game():
-    # Player Setup
-    player_x = SCREEN_WIDTH // 2 - CAR_WIDTH // 2
-    player_y = SCREEN_HEIGHT - CAR_HEIGHT - 50
-    player_speed = 12
-
-    # Road Bounds
-    road_left = SCREEN_WIDTH // 4
-    road_right = SCREEN_WIDTH - (SCREEN_WIDTH // 4)
-    lane_width = road_right - road_left
-
-    # Game State
-    score = 0
-    lives = 3
-    base_speed = 10
-    game_speed = base_speed
-    
-    enemies = []
-    shake_timer = 0
-    
-    # This variable controls the visual movement of the road lines
-    lane_marker_move_y = 0 
+def main_game(seed=None):
+    # A ghost races on its replay's seed so both runs see the same traffic
+    ghost = ReplayPlayer(Replay.load(GHOST_PATH)) if GHOST_PATH else None
+    if ghost:
+        seed = ghost.replay.seed
+    elif seed is None:
+        seed = random.randrange(1 << 32)
+    sim = RacerSim(seed)
+    recording = Replay(seed, sim.width, sim.height, sim.block)
+    road = make_road_renderer(sim.road_left, sim.lane_width)
+    pacer = FramePacer(log_path=PACE_LOG)
     
+    # Fixed-step simulation fed by measured frame time, so frame drops don't slow the game
+    pending = SIM_DT
+    interval_ms = 0
+    clock.tick()
     running = True
     while running:
+        frame_start = time.perf_counter()
         # --- 1. Event Handling ---
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -126,114 +797,273 @@ def main_game():
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     running = False
+                if event.key == pygame.K_F3:
+                    pacer.show = not pacer.show
 
         keys = pygame.key.get_pressed()
-        if keys[pygame.K_LEFT] and player_x > road_left + 10:
-            player_x -= player_speed
-        if keys[pygame.K_RIGHT] and player_x < road_right - CAR_WIDTH - 10:
-            player_x += player_speed
+        action = (ACTION_LEFT if keys[pygame.K_LEFT] else 0) | (ACTION_RIGHT if keys[pygame.K_RIGHT] else 0)
 
         # --- 2. Logic & Physics ---
-        
-        # Increase Speed based on Score (Dino Style)
-        game_speed = base_speed + (score // 5)
-        
-        # Update Road Marker Position (Synced with Game Speed)
-        lane_marker_move_y += game_speed
-        if lane_marker_move_y >= 100: # Reset after one "segment" length
-            lane_marker_move_y = 0
-        
-        # Spawn Enemies
-        if random.randint(0, 100) < 2 + (score // 10):
-            safe_spawn = True
-            spawn_x = random.randint(road_left + 20, road_right - CAR_WIDTH - 20)
-            for e in enemies:
-                if e['y'] < 300: # Increased safe distance so they don't clump
-                    safe_spawn = False
-            
-            if safe_spawn:
-                enemies.append({'x': spawn_x, 'y': -150, 'color': C_RED}) # Spawn higher up
-
-        # Move Enemies
-        for e in enemies:
-            e['y'] += game_speed # EXACT same speed as road markers
-
-        # Collision Detection
-        player_rect = pygame.Rect(player_x + 4, player_y + 4, CAR_WIDTH - 8, CAR_HEIGHT - 8)
-        
-        for e in enemies[:]:
-            enemy_rect = pygame.Rect(e['x'] + 4, e['y'] + 4, CAR_WIDTH - 8, CAR_HEIGHT - 8)
-            
-            if player_rect.colliderect(enemy_rect):
-                lives -= 1
-                shake_timer = 20 # Stronger shake
-                enemies.remove(e)
-                if lives <= 0:
-                    running = False 
-            elif e['y'] > SCREEN_HEIGHT:
-                score += 1
-                enemies.remove(e)
+        steps = 0
+        while pending >= SIM_DT and steps < MAX_CATCHUP and not sim.done:
+            sim.step(action)
+            recording.actions.append(action)
+            if ghost:
+                ghost.advance()
+            pending -= SIM_DT
+            steps += 1
+        if steps == MAX_CATCHUP:
+            pending = 0
+        if sim.done:
+            running = False
 
         # --- 3. Drawing ---
         
-        offset_x = random.randint(-10, 10) if shake_timer > 0 else 0
-        offset_y = random.randint(-10, 10) if shake_timer > 0 else 0
-        if shake_timer > 0: shake_timer -= 1
+        shaking = sim.shake_timer > 0 and pacer.enabled("shake")
+        flashing = sim.shake_timer > 1 and pacer.enabled("flash") # all but the last shake frame
+        offset_x = random.randint(-10, 10) if shaking else 0
+        offset_y = random.randint(-10, 10) if shaking else 0
 
-        screen.fill(C_GRASS)
-        
-        # Draw Road
-        pygame.draw.rect(screen, C_ASPHALT, (road_left + offset_x, 0 + offset_y, lane_width, SCREEN_HEIGHT))
-        
-        # Draw Lane Markers (SYCHRONIZED MOVEMENT)
-        # We draw extra markers above and below the screen to prevent popping
-        for i in range(-2, SCREEN_HEIGHT // 100 + 2):
-            y_pos = (i * 100) + lane_marker_move_y
-            pygame.draw.rect(screen, C_LINE, (SCREEN_WIDTH // 2 - 5 + offset_x, y_pos + offset_y, 10, 50))
+        # Road and lane markers (scrolling tile, SYCHRONIZED MOVEMENT)
+        road.begin(sim.marker_y, offset_x, offset_y, effects=shaking or flashing,
+                   scroll_markers=pacer.enabled("markers"))
 
-        # Draw Player
-        draw_og_car(player_x + offset_x, player_y + offset_y, C_CYAN)
+        # Draw Ghost and Player
+        if ghost and not ghost.sim.done:
+            road.draw_car(ghost.sim.player_x + offset_x, ghost.sim.player_y + offset_y, C_WHITE, GHOST_ALPHA)
+        road.draw_car(sim.player_x + offset_x, sim.player_y + offset_y, C_CYAN)
         
         # Draw Enemies
-        for e in enemies:
-            draw_og_car(e['x'] + offset_x, e['y'] + offset_y, e['color'])
+        enemies = sim.enemies
+        for i in enemies.active:
+            road.draw_car(enemies.x[i] + offset_x, enemies.y[i] + offset_y, enemies.color[i])
 
         # Flash Red on Hit
-        if shake_timer > 0:
-            s = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-            s.set_alpha(100)
-            s.fill(C_RED)
-            screen.blit(s, (0,0))
+        if flashing:
+            road.draw_flash()
 
         # UI
-        score_surf = font_small.render(f"SCORE: {score}", True, C_WHITE)
-        lives_surf = font_small.render(f"LIVES: {lives}", True, C_WHITE)
-        screen.blit(score_surf, (50, 50))
-        screen.blit(lives_surf, (50, 100))
+        road.draw_hud(sim.score, sim.lives)
+        if pacer.show:
+            road.draw_overlay(pacer.lines)
 
-        pygame.display.flip()
-        clock.tick(FPS)
+        road.present()
+        pacer.record(interval_ms, (time.perf_counter() - frame_start) * 1000, steps)
+        interval_ms = clock.tick(FPS)
+        pending += interval_ms / 1000
     
-    return score
+    pacer.close()
+    if RECORD_PATH:
+        recording.score = sim.score
+        recording.lives = sim.lives
+        recording.save(RECORD_PATH)
+    return sim.score
+
+def bench_cars(cars=200, frames=120):
+    """
+    Times drawing a screenful of cars with per-rect draws versus one cached blit each.
+    """
+    rng = random.Random(0)
+    colors = [C_RED, C_CYAN]
+    spots = [(rng.randint(0, SCREEN_WIDTH - CAR_WIDTH), rng.randint(0, SCREEN_HEIGHT - CAR_HEIGHT), colors[i % 2])
+             for i in range(cars)]
+    for name, draw in (("rects", lambda x, y, c: render_og_car(screen, x, y, c)), ("sprite", draw_og_car)):
+        start = time.perf_counter()
+        for _ in range(frames):
+            screen.fill(C_GRASS)
+            for x, y, c in spots:
+                draw(x, y, c)
+        per_frame = (time.perf_counter() - start) * 1000 / frames
+        print(f"{name:>6}: {per_frame:.3f} ms/frame for {cars} cars")
+
+def bench_road(cars=12, frames=300):
+    """
+    Times a quiet frame of road, cars and HUD: full redraw and flip versus the dirty-region renderer.
+    """
+    road_left = SCREEN_WIDTH // 4
+    lane_width = SCREEN_WIDTH - 2 * road_left
+    rng = random.Random(0)
+    spots = [[rng.randint(road_left, road_left + lane_width - CAR_WIDTH), rng.randint(0, SCREEN_HEIGHT)] for _ in range(cars)]
+
+    def legacy(scroll):
+        screen.fill(C_GRASS)
+        pygame.draw.rect(screen, C_ASPHALT, (road_left, 0, lane_width, SCREEN_HEIGHT))
+        for i in range(-2, SCREEN_HEIGHT // 100 + 2):
+            pygame.draw.rect(screen, C_LINE, (SCREEN_WIDTH // 2 - 5, i * 100 + scroll, 10, 50))
+        for x, y in spots:
+            draw_og_car(x, y, C_RED)
+        screen.blit(font_small.render("SCORE: 0", True, C_WHITE), (50, 50))
+        screen.blit(font_small.render("LIVES: 3", True, C_WHITE), (50, 100))
+        pygame.display.flip()
+
+    road = make_road_renderer(road_left, lane_width)
+
+    def cached(scroll):
+        road.begin(scroll)
+        for x, y in spots:
+            road.draw_car(x, y, C_RED)
+        road.draw_hud(0, 3)
+        road.present()
+
+    def still(scroll):
+        road.begin(scroll, scroll_markers=False)
+        for x, y in spots:
+            road.draw_car(x, y, C_RED)
+        road.draw_hud(0, 3)
+        road.present()
+
+    def shaken(scroll):
+        road.begin(scroll, 4, 4, effects=True)
+        for x, y in spots:
+            road.draw_car(x + 4, y + 4, C_RED)
+        road.draw_flash()
+        road.draw_hud(0, 3)
+        road.present()
+
+    for name, frame in (("full", legacy), ("dirty", cached), ("still", still), ("shaken", shaken)):
+        start = time.perf_counter()
+        for n in range(frames):
+            for spot in spots:
+                spot[1] = (spot[1] + 10) % SCREEN_HEIGHT
+            frame((n * 10) % 100)
+        per_frame = (time.perf_counter() - start) * 1000 / frames
+        print(f"{name:>6}: {per_frame:.3f} ms/frame at {SCREEN_WIDTH}x{SCREEN_HEIGHT}"
+              f"{' (lowres %dx)' % BLOCK_SIZE if LOW_RES and frame is not legacy else ''}")
+
+def bench_enemies(count=250, frames=600):
+    """
+    Times moving, retiring and collision-testing a road full of enemies: dict list versus EnemyPool.
+    """
+    road_left = SCREEN_WIDTH // 4
+    lane_width = SCREEN_WIDTH - 2 * road_left
+    player_x = SCREEN_WIDTH // 2 - CAR_WIDTH // 2
+    player_y = SCREEN_HEIGHT - CAR_HEIGHT - 50
+
+    def legacy(rng):
+        enemies = []
+        for _ in range(frames):
+            while len(enemies) < count:
+                enemies.append({'x': rng.randint(road_left, road_left + lane_width - CAR_WIDTH),
+                                'y': rng.randint(-150, SCREEN_HEIGHT), 'color': C_RED})
+            for e in enemies:
+                e['y'] += 10
+            player_rect = pygame.Rect(player_x + 4, player_y + 4, CAR_WIDTH - 8, CAR_HEIGHT - 8)
+            for e in enemies[:]:
+                if player_rect.colliderect(pygame.Rect(e['x'] + 4, e['y'] + 4, CAR_WIDTH - 8, CAR_HEIGHT - 8)):
+                    enemies.remove(e)
+                elif e['y'] > SCREEN_HEIGHT:
+                    enemies.remove(e)
+
+    def pooled(rng):
+        enemies = EnemyPool(road_left, lane_width, capacity=count)
+        for _ in range(frames):
+            while len(enemies.active) < count:
+                enemies.spawn(rng.randint(road_left, road_left + lane_width - CAR_WIDTH), rng.randint(-150, SCREEN_HEIGHT))
+            enemies.advance(10, SCREEN_HEIGHT)
+            while enemies.collide(player_x, player_y) >= 0:
+                pass
+
+    for name, run in (("dicts", legacy), ("pool", pooled)):
+        start = time.perf_counter()
+        run(random.Random(0))
+        per_frame = (time.perf_counter() - start) * 1000 / frames
+        print(f"{name:>6}: {per_frame:.3f} ms/frame for {count} enemies")
+
+def bench_env(steps=20000, n=4096, vector_steps=200):
+    """
+    Headless throughput: env-steps per second for RacerSim and for VectorRacer(n).
+    """
+    rng = random.Random(0)
+    sim = RacerSim(seed=0)
+    start = time.perf_counter()
+    for _ in range(steps):
+        sim.step(rng.randrange(4))
+        if sim.done:
+            sim.reset()
+    elapsed = time.perf_counter() - start
+    print(f"RacerSim:          {steps / elapsed:,.0f} steps/s")
+    sim.observation()
+
+    import numpy as np
+    env = VectorRacer(n, seed=0)
+    actions = np.random.default_rng(0).integers(0, 4, (vector_steps, n))
+    start = time.perf_counter()
+    for t in range(vector_steps):
+        env.step(actions[t])
+    elapsed = time.perf_counter() - start
+    print(f"VectorRacer({n}): {n * vector_steps / elapsed:,.0f} steps/s")
+    start = time.perf_counter()
+    for _ in range(vector_steps):
+        env.step(actions[0])
+        env.observation()
+    elapsed = time.perf_counter() - start
+    print(f"  with observation: {n * vector_steps / elapsed:,.0f} steps/s")
+
+def check_replay(path, seeks=20):
+    """
+    Headless re-simulation of a recorded run: speed, size, final state check and seek cost.
+    """
+    start = time.perf_counter()
+    replay = Replay.load(path)
+    loaded = time.perf_counter() - start
+    player = ReplayPlayer(replay)
+    start = time.perf_counter()
+    sim = player.run()
+    elapsed = time.perf_counter() - start
+    steps = len(replay.actions)
+    seconds = steps * SIM_DT
+    size = os.path.getsize(path)
+    final = (sim.frame, sim.lives, sim.score)
+    print(f"{path}: seed {replay.seed}, {steps} steps ({seconds:.1f} s), {size} bytes "
+          f"({size / max(seconds, 1e-9):.1f} B/s), loaded in {loaded * 1000:.2f} ms")
+    print(f"re-simulated in {elapsed * 1000:.1f} ms ({steps / max(elapsed, 1e-9):,.0f} steps/s)")
+    rng = random.Random(0)
+    start = time.perf_counter()
+    for _ in range(seeks):
+        player.seek(rng.randrange(steps + 1))
+    print(f"seek: {(time.perf_counter() - start) * 1000 / seeks:.2f} ms average over {seeks} random seeks")
+    recorded = (steps, replay.lives, replay.score)
+    ok = final == recorded
+    print("final frame %d, lives %d, score %d; recorded %d, %d, %d (block %d): %s"
+          % (final + recorded + (replay.block, "OK" if ok else "MISMATCH")))
+    return ok
 
 # --- Main Execution ---
-while True:
-    intro_screen()
-    final_score = main_game()
+# Headless imports get the simulation API only
+if __name__ == "__main__":
+    if "--bench-env" in sys.argv:
+        bench_env()
+        pygame.quit(); sys.exit()
+    if REPLAY_PATH:
+        ok = check_replay(REPLAY_PATH)
+        pygame.quit(); sys.exit(0 if ok else 1)
+    if "--bench-cars" in sys.argv:
+        bench_cars()
+        pygame.quit(); sys.exit()
+    if "--bench-road" in sys.argv:
+        bench_road()
+        pygame.quit(); sys.exit()
+    if "--bench-enemies" in sys.argv:
+        bench_enemies()
+        pygame.quit(); sys.exit()
+
+    while True:
+        intro_screen()
+        final_score = main_game()
     
-    screen.fill(C_ASPHALT)
-    draw_text_centered("CRASHED!", font_large, C_RED, -50)
-    draw_text_centered(f"Final Score: {final_score}", font_small, C_WHITE, 50)
-    draw_text_centered("Press SPACE to Restart", font_small, C_LINE, 100)
-    pygame.display.flip()
+        screen.fill(C_ASPHALT)
+        draw_text_centered("CRASHED!", font_large, C_RED, -50)
+        draw_text_centered(f"Final Score: {final_score}", font_small, C_WHITE, 50)
+        draw_text_centered("Press SPACE to Restart", font_small, C_LINE, 100)
+        pygame.display.flip()
     
-    waiting_end = True
-    while waiting_end:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit(); sys.exit()
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
+        waiting_end = True
+        while waiting_end:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
                     pygame.quit(); sys.exit()
-                if event.key == pygame.K_SPACE:
-                    waiting_end = False
\ No newline at end of file
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_ESCAPE:
+                        pygame.quit(); sys.exit()
+                    if event.key == pygame.K_SPACE:
+                        waiting_end = False
@@ -4,6 +4,16 @@ import math
 import time
 import random
 import ctypes
+import sys
+import csv
+import multiprocessing
+from multiprocessing import shared_memory
+from collections import deque
+
+try:
+    import numpy as np
+except ImportError: # Falls back to the pure-Python ParticleField
+    np = None
 
 # --- 1. DPI Fix (Sharp rendering on Windows) ---
 try:
@@ -24,8 +34,35 @@ COLOR_BG = "#020205" # Almost pure black
 LINE_COLORS = ["#FFFFFF", "#80DEEA", "#26C6DA", "#006064"]
 MAX_DISTANCE = 130 # Pixels. Nodes further than this won't connect.
 
+def arg_value(flag):
+    return sys.argv[sys.argv.index(flag) + 1] if flag in sys.argv[:-1] else None
+
+# Pair search is near-linear (grid below); canvas drawing is the limit now. This is also the
+# ceiling the frame scheduler grows back to, so --particles N raises it (e.g. with --worker)
+PARTICLE_COUNT = int(arg_value("--particles") or 60)
+
+# Frame scheduling: the delay after each frame is what is left of the frame interval
+TARGET_FPS = 33 # While visible and focused (the old fixed after(30))
+IDLE_FPS = 5 # While the window is unfocused; hidden/iconified windows stop animating
+TUNE_EVERY = 30 # Frames between particle-count decisions
+TUNE_HIGH = 0.6 # Mean frame cost above this share of the interval: fewer particles
+TUNE_LOW = 0.3 # Below this share: grow back towards PARTICLE_COUNT
+MIN_PARTICLES = 15
+
+# --raster draws the network into one offscreen image per frame (--raster-aa: 2x supersampled)
+RASTER_AA = "--raster-aa" in sys.argv
+RENDER_BACKEND = "raster" if RASTER_AA or "--raster" in sys.argv else "canvas"
+# --worker runs the simulation and pair search in a separate process (needs numpy)
+WORKER_MODE = "--worker" in sys.argv
+
+# --bench-suite writes its results as CSV here (--bench-out PATH to change)
+BENCH_OUT = arg_value("--bench-out") or "particle_bench.csv"
+
+# Neighbour cells visited from each grid cell, so every adjacent pair of cells is checked once
+HALF_NEIGHBORS = ((1, 0), (-1, 1), (0, 1), (1, 1))
+
 class Particle:
-    def _init_(self, w, h):
+    def __init__(self, w, h):
         self.w = w
         self.h = h
         self.x = random.randint(0, w)
@@ -43,9 +80,752 @@ class Particle:
         if self.x <= 0 or self.x >= self.w: self.vx *= -1
         if self.y <= 0 or self.y >= self.h: self.vy *= -1
 
+def color_bucket(dist):
+    # Determine color based on distance (Fake transparency)
+    intensity = int((dist / MAX_DISTANCE) * len(LINE_COLORS))
+    if intensity >= len(LINE_COLORS): intensity = len(LINE_COLORS) - 1
+    return intensity
+
+def line_color(dist):
+    return LINE_COLORS[color_bucket(dist)]
+
+def find_pairs_brute(particles, max_distance=MAX_DISTANCE):
+    """
+    The original O(N^2) scan. Returns ([(p1, p2, dist), ...], number of distance tests).
+    """
+    pairs = []
+    n = len(particles)
+    for i in range(n):
+        p1 = particles[i]
+        for j in range(i + 1, n):
+            p2 = particles[j]
+            dist = math.hypot(p1.x - p2.x, p1.y - p2.y)
+            if dist < max_distance:
+                pairs.append((p1, p2, dist))
+    return pairs, n * (n - 1) // 2
+
+def find_pairs_grid(particles, max_distance=MAX_DISTANCE):
+    """
+    Same pairs as find_pairs_brute, but particles are binned into a uniform grid of
+    max_distance cells (rebuilt every frame), so only particles in the same or adjacent
+    cells are ever compared.
+    """
+    grid = {}
+    for p in particles:
+        key = (int(p.x // max_distance), int(p.y // max_distance))
+        cell = grid.get(key)
+        if cell is None:
+            grid[key] = [p]
+        else:
+            cell.append(p)
+
+    pairs = []
+    tests = 0
+    hypot = math.hypot
+    for (cx, cy), cell in grid.items():
+        n = len(cell)
+        tests += n * (n - 1) // 2
+        for i in range(n):
+            p1 = cell[i]
+            for j in range(i + 1, n):
+                p2 = cell[j]
+                dist = hypot(p1.x - p2.x, p1.y - p2.y)
+                if dist < max_distance:
+                    pairs.append((p1, p2, dist))
+        for dx, dy in HALF_NEIGHBORS:
+            other = grid.get((cx + dx, cy + dy))
+            if other is None:
+                continue
+            tests += n * len(other)
+            for p1 in cell:
+                for p2 in other:
+                    dist = hypot(p1.x - p2.x, p1.y - p2.y)
+                    if dist < max_distance:
+                        pairs.append((p1, p2, dist))
+    return pairs, tests
+
+# --- Particle Engines ---
+# Both fields expose step() -> one group of (x1, y1, x2, y2) segments per LINE_COLORS entry,
+# keys -> a matching group of stable per-connection keys, and nodes() -> (x, y, radius) rows,
+# so the renderer does not care which one it drives. step() is move(), pairs() and
+# build_segments(), which the benchmarks also time one by one.
+
+class ParticleField:
+    """
+    Pure-Python engine: Particle objects and the grid pair search (or any other search
+    with the find_pairs_* signature, e.g. the all-pairs scan for comparison).
+    """
+    def __init__(self, n, w, h, search=find_pairs_grid):
+        self.w = w
+        self.h = h
+        self.particles = [Particle(w, h) for _ in range(n)]
+        self.search = search
+        self.keys = [[] for _ in LINE_COLORS]
+        self.tests = 0
+
+    def __len__(self):
+        return len(self.particles)
+
+    def resize(self, n):
+        del self.particles[n:]
+        self.particles.extend(Particle(self.w, self.h) for _ in range(n - len(self.particles)))
+
+    def move(self):
+        for p in self.particles:
+            p.move()
+
+    def pairs(self):
+        pairs, self.tests = self.search(self.particles)
+        return pairs
+
+    def build_segments(self, pairs):
+        segments = [[] for _ in LINE_COLORS]
+        self.keys = [[] for _ in LINE_COLORS]
+        for p1, p2, dist in pairs:
+            bucket = color_bucket(dist)
+            segments[bucket].append((p1.x, p1.y, p2.x, p2.y))
+            a, b = id(p1), id(p2)
+            self.keys[bucket].append((a, b) if a < b else (b, a))
+        return segments
+
+    def step(self):
+        self.move()
+        return self.build_segments(self.pairs())
+
+    def nodes(self):
+        return [(p.x, p.y, p.radius) for p in self.particles]
+
+class NumpyParticleField:
+    """
+    Vectorized engine. Positions and velocities live in (N, 2) arrays; one step moves and
+    bounces everything at once, then the same MAX_DISTANCE grid is built by keeping the
+    arrays sorted by cell id, and all candidate pairs (same cell, later in the order, plus
+    the HALF_NEIGHBORS cells) are expanded and measured in batched array operations.
+    """
+    def __init__(self, n, w, h, seed=None):
+        self.rng = rng = np.random.default_rng(seed)
+        self.w = w
+        self.h = h
+        self.pos = np.column_stack((rng.integers(0, w, n, endpoint=True),
+                                    rng.integers(0, h, n, endpoint=True))).astype(np.float64)
+        # Random slow velocity
+        self.vel = rng.uniform(-0.8, 0.8, (n, 2))
+        self.radius = rng.integers(2, 4, n, endpoint=True)
+        self.nx = int(w // MAX_DISTANCE) + 1
+        self.ny = int(h // MAX_DISTANCE) + 1
+        self.rank = np.arange(n, dtype=np.int32)
+        self.ids = np.arange(n, dtype=np.int64)  # Follows each particle through the reorders
+        self.keys = [np.empty(0, np.int64) for _ in LINE_COLORS]
+        self.tests = 0
+
+    def __len__(self):
+        return len(self.ids)
+
+    def resize(self, n):
+        """
+        Drops the particles with the highest ids or appends new random ones, so ids (and
+        the connection keys built from them) stay within 0..n-1.
+        """
+        count = len(self.ids)
+        if n < count:
+            keep = self.ids < n
+            self.pos, self.vel = self.pos[keep], self.vel[keep]
+            self.radius, self.ids = self.radius[keep], self.ids[keep]
+        elif n > count:
+            rng, extra = self.rng, n - count
+            pos = np.column_stack((rng.integers(0, self.w, extra, endpoint=True),
+                                   rng.integers(0, self.h, extra, endpoint=True)))
+            self.pos = np.concatenate((self.pos, pos))
+            self.vel = np.concatenate((self.vel, rng.uniform(-0.8, 0.8, (extra, 2))))
+            self.radius = np.concatenate((self.radius, rng.integers(2, 4, extra, endpoint=True)))
+            self.ids = np.concatenate((self.ids, np.arange(count, n, dtype=np.int64)))
+        self.rank = np.arange(n, dtype=np.int32)
+
+    def move(self):
+        pos, vel = self.pos, self.vel
+        pos += vel
+        # Bounce off edges
+        vel[(pos[:, 0] <= 0) | (pos[:, 0] >= self.w), 0] *= -1
+        vel[(pos[:, 1] <= 0) | (pos[:, 1] >= self.h), 1] *= -1
+
+    def sort_by_cell(self):
+        """
+        Reorders the particle arrays by grid cell (a few swaps per frame, since particles
+        drift slowly) and returns (cell x, cell y, first index, count per cell id).
+        """
+        nx, ny = self.nx, self.ny
+        # Particles that overshoot an edge before bouncing are counted in the border cell
+        cx = np.clip((self.pos[:, 0] // MAX_DISTANCE).astype(np.int32), 0, nx - 1)
+        cy = np.clip((self.pos[:, 1] // MAX_DISTANCE).astype(np.int32), 0, ny - 1)
+        cell = cx * ny + cy
+        if (cell[1:] < cell[:-1]).any():
+            order = np.argsort(cell, kind="stable")
+            self.pos = self.pos[order]
+            self.vel = self.vel[order]
+            self.radius = self.radius[order]
+            self.ids = self.ids[order]
+            cx, cy = cx[order], cy[order]
+        counts = np.bincount(cx * ny + cy, minlength=nx * ny).astype(np.int32)
+        starts = np.cumsum(counts, dtype=np.int32) - counts
+        return cx, cy, starts, counts
+
+    def candidates(self):
+        """
+        Every (a, b) index pair that shares a cell or sits in neighbouring cells.
+        """
+        ny = self.ny
+        cx, cy, starts, counts = self.sort_by_cell()
+        rank = self.rank
+        cell = cx * ny + cy
+        # For every particle and every cell it looks at: first candidate and how many
+        first = [rank + 1]
+        length = [starts[cell] + counts[cell] - rank - 1]
+        for dx, dy in HALF_NEIGHBORS:
+            ncx, ncy = cx + dx, cy + dy
+            valid = (ncx >= 0) & (ncx < self.nx) & (ncy < ny)
+            neighbor = np.where(valid, ncx * ny + ncy, 0)
+            first.append(starts[neighbor])
+            length.append(np.where(valid, counts[neighbor], 0))
+        first = np.concatenate(first)
+        length = np.concatenate(length)
+        total = int(length.sum())
+        self.tests = total
+        a = np.repeat(np.tile(rank, len(HALF_NEIGHBORS) + 1), length)
+        b = np.repeat(first - (np.cumsum(length, dtype=np.int32) - length), length)
+        b += np.arange(total, dtype=np.int32)
+        return a, b
+
+    def pairs(self):
+        """
+        Returns (first, second, squared distance) for every pair closer than MAX_DISTANCE;
+        first and second index self.pos (which step() may reorder).
+        """
+        a, b = self.candidates()
+        # Squared float32 distances: no square root is needed to select or bucket
+        xs = self.pos[:, 0].astype(np.float32)
+        ys = self.pos[:, 1].astype(np.float32)
+        dx = xs[a]
+        dx -= xs[b]
+        dy = ys[a]
+        dy -= ys[b]
+        dx *= dx
+        dy *= dy
+        dx += dy
+        close = np.flatnonzero(dx < MAX_DISTANCE * MAX_DISTANCE)
+        return a[close], b[close], dx[close]
+
+    def step(self):
+        self.move()
+        return self.build_segments(self.pairs())
+
+    def build_segments(self, pairs):
+        first, second, dist2 = pairs
+        # Bucket k holds distances in [k, k + 1) * MAX_DISTANCE / len(LINE_COLORS), as color_bucket()
+        bucket = np.zeros(len(dist2), np.int8)
+        for k in range(1, len(LINE_COLORS)):
+            bucket += dist2 >= (k * MAX_DISTANCE / len(LINE_COLORS)) ** 2
+        xs, ys = self.pos[:, 0], self.pos[:, 1]
+        ids, n = self.ids, len(self.ids)
+        segments = []
+        for k in range(len(LINE_COLORS)):
+            pick = np.flatnonzero(bucket == k)
+            i, j = first[pick], second[pick]
+            segments.append(np.column_stack((xs[i], ys[i], xs[j], ys[j])))
+            self.keys[k] = np.minimum(ids[i], ids[j]) * n + np.maximum(ids[i], ids[j])
+        return segments
+
+    def nodes(self):
+        return np.column_stack((self.pos, self.radius))
+
+def make_field(n, w, h, seed=None):
+    if np is not None:
+        return NumpyParticleField(n, w, h, seed)
+    random.seed(seed)
+    return ParticleField(n, w, h)
+
+def rows(group):
+    # NumPy groups become plain floats before they reach Tk
+    return group.tolist() if hasattr(group, "tolist") else group
+
+# --- Worker Process ---
+# One shared block: a control row, then two frame buffers. The worker always writes the
+# buffer that is neither published nor pinned by the UI, then publishes it; the UI pins
+# the published buffer for exactly as long as it draws from it.
+PUBLISHED, PINNED, SEQ, REQUESTED, STOP, PAUSED, WAITS, OVERRUNS, CLIPPED = range(9)
+CONTROL_SLOTS = 9
+FRAME_HEADER = 2 + len(LINE_COLORS) # sequence number, node count, segments per color
+
+def segment_capacity(n, w, h):
+    # Expected connections for n uniform particles, with headroom for clustering
+    expected = n * n * math.pi * MAX_DISTANCE ** 2 / (2 * w * h)
+    return min(n * (n - 1) // 2, int(1.5 * expected) + 64 * n)
+
+def shared_size(n, cap):
+    frame = 8 * FRAME_HEADER + 8 * cap + 16 * cap + 12 * n
+    return 8 * CONTROL_SLOTS + 2 * (frame + (-frame) % 8)
+
+def shared_views(buf, n, cap):
+    """
+    NumPy views over the shared block: (control row, [frame 0, frame 1]), each frame a
+    dict of header, keys, segs and nodes arrays.
+    """
+    control = np.ndarray((CONTROL_SLOTS,), np.int64, buf)
+    offset = 8 * CONTROL_SLOTS
+    frames = []
+    for _ in range(2):
+        frame = {}
+        for name, shape, dtype in (("header", (FRAME_HEADER,), np.int64), ("keys", (cap,), np.int64),
+                                   ("segs", (cap, 4), np.float32), ("nodes", (n, 3), np.float32)):
+            frame[name] = np.ndarray(shape, dtype, buf, offset)
+            offset += frame[name].nbytes
+        offset += (-offset) % 8
+        frames.append(frame)
+    return control, frames
+
+def simulation_worker(name, n, w, h, cap, lock, seed=None):
+    """
+    Worker process body: steps a NumpyParticleField at TARGET_FPS and writes every frame
+    into the free shared buffer until the control row asks it to stop.
+    """
+    shm = shared_memory.SharedMemory(name=name)
+    control, frames = shared_views(shm.buf, n, cap)
+    field = NumpyParticleField(n, w, h, seed)
+    interval = 1 / TARGET_FPS
+    next_tick = time.perf_counter()
+    frame = header = None
+    try:
+        while not control[STOP]:
+            if control[PAUSED]:
+                time.sleep(0.05)
+                next_tick = time.perf_counter()
+                continue
+            if control[REQUESTED] != len(field):
+                field.resize(int(control[REQUESTED]))
+            segments = field.step()
+            nodes = field.nodes()
+            while True:
+                with lock:
+                    target = 1 - control[PUBLISHED] if control[PUBLISHED] >= 0 else 0
+                    free = target != control[PINNED]
+                if free:
+                    break
+                # The UI is still drawing from this buffer
+                control[WAITS] += 1
+                time.sleep(0.001)
+            frame = frames[target]
+            header = frame["header"]
+            start = 0
+            for k, group in enumerate(segments):
+                count = min(len(group), cap - start)
+                if count < len(group):
+                    control[CLIPPED] += 1
+                frame["segs"][start:start + count] = group[:count]
+                frame["keys"][start:start + count] = field.keys[k][:count]
+                header[2 + k] = count
+                start += count
+            frame["nodes"][:len(nodes)] = nodes
+            header[1] = len(nodes)
+            with lock:
+                control[SEQ] += 1
+                header[0] = control[SEQ]
+                control[PUBLISHED] = target
+            next_tick += interval
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                control[OVERRUNS] += 1
+                next_tick = time.perf_counter()
+    finally:
+        del control, frames, frame, header
+        shm.close()
+
+class WorkerField:
+    """
+    Field interface (step, keys, nodes, resize) over a simulation_worker process. step()
+    pins the newest published buffer and returns views into it, so nothing is copied on
+    the Tk side; release() must follow once the frame has been drawn.
+    """
+    def __init__(self, n, w, h, seed=None):
+        self.capacity = n
+        cap = segment_capacity(n, w, h)
+        self.shm = shared_memory.SharedMemory(create=True, size=shared_size(n, cap))
+        self.control, self.frames = shared_views(self.shm.buf, n, cap)
+        self.control[:] = 0
+        self.control[PUBLISHED] = self.control[PINNED] = -1
+        self.control[REQUESTED] = n
+        self.lock = multiprocessing.Lock()
+        self.process = multiprocessing.Process(
+            target=simulation_worker, args=(self.shm.name, n, w, h, cap, self.lock, seed), daemon=True)
+        self.process.start()
+        self.segments = [np.empty((0, 4), np.float32) for _ in LINE_COLORS]
+        self.keys = [np.empty(0, np.int64) for _ in LINE_COLORS]
+        self.node_rows = np.empty((0, 3), np.float32)
+        self.seen = 0
+        self.shown = self.dropped = self.repeats = 0
+
+    def __len__(self):
+        # The requested count: the worker applies it on its next step, and before the
+        # first frame arrives there are no node rows to count yet
+        return int(self.control[REQUESTED])
+
+    def resize(self, n):
+        self.control[REQUESTED] = min(n, self.capacity)
+
+    def pause(self, paused):
+        self.control[PAUSED] = int(paused)
+
+    def step(self):
+        with self.lock:
+            index = int(self.control[PUBLISHED])
+            self.control[PINNED] = index
+        if index < 0: # No frame from the worker yet
+            return self.segments
+        frame = self.frames[index]
+        header = frame["header"]
+        seq = int(header[0])
+        if seq == self.seen:
+            # The worker has not finished a new frame; the pinned one is still intact
+            self.repeats += 1
+        else:
+            if self.seen:
+                self.dropped += seq - self.seen - 1
+            self.shown += 1
+            self.seen = seq
+        start = 0
+        for k in range(len(LINE_COLORS)):
+            end = start + int(header[2 + k])
+            self.segments[k] = frame["segs"][start:end]
+            self.keys[k] = frame["keys"][start:end]
+            start = end
+        self.node_rows = frame["nodes"][:int(header[1])]
+        return self.segments
+
+    def nodes(self):
+        return self.node_rows
+
+    def release(self):
+        with self.lock:
+            self.control[PINNED] = -1
+
+    def stats(self):
+        control = self.control
+        return {"produced": int(control[SEQ]), "shown": self.shown, "dropped": self.dropped,
+                "repeats": self.repeats, "worker_waits": int(control[WAITS]),
+                "worker_overruns": int(control[OVERRUNS]), "clipped": int(control[CLIPPED])}
+
+    def text(self):
+        st = self.stats()
+        return (f"worker: shown {st['shown']}/{st['produced']}  dropped {st['dropped']}\n"
+                f"repeats {st['repeats']}  waits {st['worker_waits']}  overruns {st['worker_overruns']}")
+
+    def close(self):
+        if self.shm is None:
+            return
+        self.control[STOP] = 1
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.terminate()
+        # Every view has to go before the block can be closed
+        self.segments = self.keys = self.node_rows = self.frames = self.control = None
+        self.shm.close()
+        self.shm.unlink()
+        self.shm = None
+
+# --- Canvas Rendering ---
+def draw_recreate(canvas, segments, nodes):
+    """
+    The original renderer: delete every network item and create them all again.
+    """
+    canvas.delete("network") # Clear previous frame's lines/dots
+    # We draw lines first so dots appear on top
+    for color, group in zip(LINE_COLORS, segments):
+        for x1, y1, x2, y2 in rows(group):
+            canvas.create_line(x1, y1, x2, y2, fill=color, width=1, tags="network")
+    for x, y, r in rows(nodes):
+        canvas.create_oval(x - r, y - r, x + r, y + r, fill="white", outline="", tags="network")
+
+class CanvasItemPool:
+    """
+    Keeps network items alive between frames. Each particle slot owns one oval; each
+    connection keeps its line item for as long as it exists (found by its key), and lines
+    of ended connections are hidden and reused. An item is only touched when its rounded
+    coordinates, color or visibility actually change, and those updates are sent to Tcl as
+    one script per frame instead of one call each.
+    """
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.path = str(canvas)
+        self.ovals = []
+        self.oval_coords = []
+        self.lines = {}     # connection key -> [item, color index, coords]
+        self.free = []      # hidden line items ready for reuse
+        self.commands = 0   # Tcl commands in the last frame's script
+
+    def draw(self, segments, keys, nodes):
+        canvas, path = self.canvas, self.path
+        script = []
+        old = self.lines
+        live = {}
+        created = False
+        for c, (group, group_keys) in enumerate(zip(segments, keys)):
+            for (x1, y1, x2, y2), key in zip(rows(group), rows(group_keys)):
+                coords = (round(x1), round(y1), round(x2), round(y2))
+                entry = old.pop(key, None)
+                if entry is None:
+                    if self.free:
+                        item = self.free.pop()
+                        script.append(f"{path} coords {item} {coords[0]} {coords[1]} {coords[2]} {coords[3]}")
+                        script.append(f"{path} itemconfigure {item} -fill {LINE_COLORS[c]} -state normal")
+                    else:
+                        item = canvas.create_line(*coords, fill=LINE_COLORS[c], width=1, tags=("network", "line"))
+                        created = True
+                    entry = [item, c, coords]
+                else:
+                    if entry[2] != coords:
+                        script.append(f"{path} coords {entry[0]} {coords[0]} {coords[1]} {coords[2]} {coords[3]}")
+                        entry[2] = coords
+                    if entry[1] != c:
+                        script.append(f"{path} itemconfigure {entry[0]} -fill {LINE_COLORS[c]}")
+                        entry[1] = c
+                live[key] = entry
+        # Connections that ended this frame
+        for item, _, _ in old.values():
+            script.append(f"{path} itemconfigure {item} -state hidden")
+            self.free.append(item)
+        self.lines = live
+
+        nodes = rows(nodes)
+        for i, (x, y, r) in enumerate(nodes):
+            coords = (round(x - r), round(y - r), round(x + r), round(y + r))
+            if i == len(self.ovals):
+                self.ovals.append(canvas.create_oval(*coords, fill="white", outline="", tags=("network", "node")))
+                self.oval_coords.append(coords)
+                created = True
+            elif self.oval_coords[i] != coords:
+                script.append(f"{path} coords {self.ovals[i]} {coords[0]} {coords[1]} {coords[2]} {coords[3]}")
+                self.oval_coords[i] = coords
+        while len(self.ovals) > len(nodes):
+            script.append(f"{path} delete {self.ovals.pop()}")
+            self.oval_coords.pop()
+        # New lines are created on top; keep the dots above them
+        if created:
+            script.append(f"{path} raise node")
+        if script:
+            canvas.tk.eval("\n".join(script))
+        self.commands = len(script)
+
+    def clear(self):
+        self.canvas.delete("network")
+        self.__init__(self.canvas)
+
+class CallCounter:
+    """
+    Stands in for a widget's Tcl interpreter and counts the calls made into it and the
+    Tcl commands they run (a script passed to eval counts one per line).
+    """
+    def __init__(self, tk):
+        self._tk = tk
+        self.calls = 0
+        self.commands = 0
+
+    def call(self, *args):
+        self.calls += 1
+        self.commands += 1
+        return self._tk.call(*args)
+
+    def eval(self, script):
+        self.calls += 1
+        self.commands += script.count("\n") + 1
+        return self._tk.eval(script)
+
+    def __getattr__(self, name):
+        return getattr(self._tk, name)
+
+# --- Raster Rendering ---
+def hex_rgb(color):
+    return tuple(int(color[i:i + 2], 16) for i in (1, 3, 5))
+
+class Rasterizer:
+    """
+    Draws segment groups and nodes into a reused NumPy buffer of palette indices (0 is the
+    background, 1-4 the line colors, 5 the nodes), then maps it to RGB in one lookup.
+    Lines are sampled once per pixel along their major axis, all segments of a color at once;
+    nodes are stamped as precomputed discs. supersample > 1 renders larger and box-filters
+    down (anti-aliasing).
+    """
+    def __init__(self, w, h, supersample=1):
+        self.w = w
+        self.h = h
+        self.scale = supersample
+        self.index = np.zeros((h * supersample, w * supersample), np.uint8)
+        self.flat = self.index.reshape(-1)
+        colors = [COLOR_BG] + LINE_COLORS + ["#FFFFFF"]
+        self.palette = np.array([hex_rgb(c) for c in colors], np.uint16 if supersample > 1 else np.uint8)
+        self.discs = {}
+
+    def disc(self, r):
+        offsets = self.discs.get(r)
+        if offsets is None:
+            dy, dx = np.mgrid[-r:r + 1, -r:r + 1]
+            inside = dx * dx + dy * dy <= r * r
+            offsets = self.discs[r] = (dy[inside], dx[inside])
+        return offsets
+
+    def lines(self, group, color):
+        group = np.asarray(group, np.float32).reshape(-1, 4) * self.scale
+        if not len(group):
+            return
+        x1, y1 = group[:, 0], group[:, 1]
+        dx, dy = group[:, 2] - x1, group[:, 3] - y1
+        steps = np.maximum(np.abs(dx), np.abs(dy)).astype(np.int32) + 1
+        span = np.maximum(steps - 1, 1).astype(np.float32)
+        seg = np.repeat(np.arange(len(group), dtype=np.int32), steps)
+        k = np.arange(len(seg), dtype=np.int32) - np.repeat(np.cumsum(steps, dtype=np.int32) - steps, steps)
+        rows, cols = self.index.shape
+        xs = np.clip(x1[seg] + (dx / span)[seg] * k + 0.5, 0, cols - 1).astype(np.int32)
+        ys = np.clip(y1[seg] + (dy / span)[seg] * k + 0.5, 0, rows - 1).astype(np.int32)
+        self.flat[ys * cols + xs] = color
+
+    def nodes(self, nodes):
+        nodes = np.asarray(nodes, np.float32).reshape(-1, 3)
+        cx = (nodes[:, 0] * self.scale + 0.5).astype(np.int32)
+        cy = (nodes[:, 1] * self.scale + 0.5).astype(np.int32)
+        radius = nodes[:, 2].astype(np.int32)
+        rows, cols = self.index.shape
+        for r in np.unique(radius):
+            pick = radius == r
+            oy, ox = self.disc(int(r) * self.scale)
+            xs = (cx[pick, None] + ox).ravel()
+            ys = (cy[pick, None] + oy).ravel()
+            keep = (xs >= 0) & (xs < cols) & (ys >= 0) & (ys < rows)
+            self.flat[ys[keep] * cols + xs[keep]] = len(self.palette) - 1
+
+    def render(self, segments, nodes):
+        """
+        Returns an (h, w, 3) uint8 frame.
+        """
+        self.index.fill(0)
+        # We draw lines first so dots appear on top
+        for color, group in enumerate(segments, 1):
+            self.lines(group, color)
+        self.nodes(nodes)
+        s = self.scale
+        if s == 1:
+            return np.take(self.palette, self.index, axis=0)
+        # Box filter: sum each of the s*s sub-pixel grids, then divide once
+        acc = np.zeros((self.h, self.w, 3), np.uint16)
+        for dy in range(s):
+            for dx in range(s):
+                acc += np.take(self.palette, self.index[dy::s, dx::s], axis=0)
+        return (acc // (s * s)).astype(np.uint8)
+
+class RasterRenderer:
+    """
+    Same draw() interface as CanvasItemPool, but the whole network is one image item kept
+    beneath the "ui" text; each frame is rasterized offscreen and pushed to its PhotoImage
+    as binary PPM data.
+    """
+    def __init__(self, canvas, supersample=1):
+        self.canvas = canvas
+        self.supersample = supersample
+        self.raster = None
+        self.photo = None
+        self.item = None
+
+    def draw(self, segments, keys, nodes):
+        w = max(self.canvas.winfo_width(), 1)
+        h = max(self.canvas.winfo_height(), 1)
+        if self.raster is None or (self.raster.w, self.raster.h) != (w, h):
+            self.raster = Rasterizer(w, h, self.supersample)
+            self.photo = tk.PhotoImage(width=w, height=h)
+            if self.item is None:
+                self.item = self.canvas.create_image(0, 0, anchor="nw", image=self.photo, tags="network")
+                self.canvas.tag_lower(self.item)
+            else:
+                self.canvas.itemconfigure(self.item, image=self.photo)
+        frame = self.raster.render(segments, nodes)
+        self.photo.configure(data=b"P6 %d %d 255 " % (w, h) + frame.tobytes(), format="PPM")
+
+    def clear(self):
+        self.canvas.delete("network")
+        self.__init__(self.canvas, self.supersample)
+
+def make_renderer(canvas):
+    if RENDER_BACKEND == "raster" and np is not None:
+        return RasterRenderer(canvas, 2 if RASTER_AA else 1)
+    return CanvasItemPool(canvas)
+
+# --- Frame Scheduling ---
+class FrameScheduler:
+    """
+    Measures what each frame costs and returns the delay for the next after() call, so the
+    cadence holds the frame interval instead of adding the frame time on top of it. Every
+    TUNE_EVERY frames the mean cost is compared with the TARGET_FPS interval and a new
+    particle count is suggested.
+    """
+    def __init__(self, target_fps=TARGET_FPS, idle_fps=IDLE_FPS):
+        self.interval_ms = 1000 / target_fps
+        self.idle_ms = 1000 / idle_fps
+        self.costs = deque(maxlen=TUNE_EVERY)
+        self.frame = 0
+        self.late = 0
+        self.fps = 0.0
+        self.delay = 0
+        self.state = "active"
+        self.last_start = None
+
+    def begin(self):
+        now = time.perf_counter()
+        if self.last_start is not None and now > self.last_start:
+            self.fps += (1 / (now - self.last_start) - self.fps) * 0.1
+        self.last_start = now
+        return now
+
+    def end(self, start, focused):
+        """
+        Records the frame started at start and returns the next delay in ms.
+        """
+        cost = (time.perf_counter() - start) * 1000
+        self.frame += 1
+        self.costs.append(cost)
+        if cost > self.interval_ms:
+            self.late += 1
+        self.state = "active" if focused else "idle"
+        self.delay = max(1, int((self.interval_ms if focused else self.idle_ms) - cost))
+        return self.delay
+
+    def pause(self):
+        self.state = "paused"
+        self.last_start = None # The hidden stretch is not a frame interval
+
+    def tune(self, count):
+        if self.frame % TUNE_EVERY or len(self.costs) < TUNE_EVERY:
+            return count
+        cost = sum(self.costs) / len(self.costs)
+        if cost > self.interval_ms * TUNE_HIGH:
+            count = max(MIN_PARTICLES, int(count * 0.85))
+        elif cost < self.interval_ms * TUNE_LOW:
+            count = min(PARTICLE_COUNT, max(count + 1, int(count * 1.1)))
+        else:
+            return count
+        self.costs.clear() # Judge the new count on its own frames
+        return count
+
+    def stats(self):
+        cost = sum(self.costs) / len(self.costs) if self.costs else 0.0
+        return {"state": self.state, "fps": self.fps, "cost_ms": cost, "delay_ms": self.delay,
+                "frames": self.frame, "late": self.late}
+
+    def text(self, particles):
+        st = self.stats()
+        return (f"{st['fps']:5.1f} FPS  {st['state']}\n"
+                f"frame {st['cost_ms']:.1f} ms  next in {st['delay_ms']} ms\n"
+                f"late {st['late']}/{st['frames']}  particles {particles}")
+
 class FocusNetworkApp(ctk.CTk):
-    def _init_(self):
-        super()._init_()
+    def __init__(self):
+        super().__init__()
 
         self.title("Neural Focus")
         self.geometry("800x600")
@@ -54,12 +834,16 @@ class FocusNetworkApp(ctk.CTk):
         self.running = False
         self.total_seconds = 0
         self.start_time = 0
-        self.particles = []
+        self.field = None
+        self.worker = None
+        self.scheduler = FrameScheduler()
+        self.after_id = None
         self.quotes = ["Connect the dots.", "Thinking...", "Deep Work Mode.", "Neural Link: Active.", "Silence the noise."]
         
         # --- Canvas ---
         self.canvas = tk.Canvas(self, bg=COLOR_BG, highlightthickness=0, bd=0)
         self.canvas.place(relx=0, rely=0, relwidth=1, relheight=1)
+        self.renderer = make_renderer(self.canvas)
         
         # --- UI INPUTS (Floating) ---
         self.entry = ctk.CTkEntry(
@@ -91,8 +875,17 @@ class FocusNetworkApp(ctk.CTk):
             0, 0, text="", font=("Arial", 20, "italic"), fill="#B0BEC5", state="hidden", tags="ui"
         )
 
+        # Scheduler stats (F3)
+        self.txt_stats = self.canvas.create_text(
+            10, 10, text="", anchor="nw", font=("Consolas", 11), fill="#B0BEC5", state="hidden", tags="ui"
+        )
+
         self.bind("<Escape>", self.stop_focus)
         self.bind("<Configure>", self.on_resize)
+        self.bind("<Unmap>", self.on_unmap)
+        self.bind("<Map>", self.on_map)
+        self.bind("<F3>", self.toggle_stats)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
         
         self.after(100, self.init_particles)
         self.animate()
@@ -100,12 +893,38 @@ class FocusNetworkApp(ctk.CTk):
     def init_particles(self):
         w = self.winfo_screenwidth()
         h = self.winfo_screenheight()
-        # Create 60 nodes. Too many = lag (O(N^2) complexity)
-        self.particles = [Particle(w, h) for _ in range(60)]
+        if WORKER_MODE and np is not None:
+            self.worker = self.field = WorkerField(PARTICLE_COUNT, w, h)
+        else:
+            self.field = make_field(PARTICLE_COUNT, w, h)
         self.center_ui()
 
+    def on_close(self):
+        if self.worker is not None:
+            self.worker.close()
+        self.destroy()
+
     def on_resize(self, event):
         self.center_ui()
+
+    def on_unmap(self, event):
+        # Toplevel bindings also fire for every child widget
+        if event.widget is self and self.after_id is not None:
+            self.after_cancel(self.after_id)
+            self.after_id = None
+            self.scheduler.pause()
+            if self.worker is not None:
+                self.worker.pause(True)
+
+    def on_map(self, event):
+        if event.widget is self and self.after_id is None:
+            self.after_id = self.after(1, self.animate)
+            if self.worker is not None:
+                self.worker.pause(False)
+
+    def toggle_stats(self, event=None):
+        shown = self.canvas.itemcget(self.txt_stats, "state") == "hidden"
+        self.canvas.itemconfigure(self.txt_stats, state="normal" if shown else "hidden")
         
     def center_ui(self):
         w = self.winfo_width()
@@ -152,39 +971,13 @@ class FocusNetworkApp(ctk.CTk):
         self.btn_start.place(relx=0.5, rely=0.6, anchor="center")
 
     def animate(self):
-        # 1. Move Particles & Redraw Dots
-        self.canvas.delete("network") # Clear previous frame's lines/dots
-        
-        # We draw lines first so dots appear on top
-        for i, p1 in enumerate(self.particles):
-            p1.move()
-            
-            # Check connection with neighbors (O(N^2) loop)
-            for j in range(i + 1, len(self.particles)):
-                p2 = self.particles[j]
-                
-                # Calculate Euclidean distance
-                dx = p1.x - p2.x
-                dy = p1.y - p2.y
-                dist = math.hypot(dx, dy)
-                
-                if dist < MAX_DISTANCE:
-                    # Determine color based on distance (Fake transparency)
-                    intensity = int((dist / MAX_DISTANCE) * len(LINE_COLORS))
-                    if intensity >= len(LINE_COLORS): intensity = len(LINE_COLORS) - 1
-                    col = LINE_COLORS[intensity]
-                    
-                    self.canvas.create_line(
-                        p1.x, p1.y, p2.x, p2.y,
-                        fill=col, width=1, tags="network"
-                    )
-
-            # Draw the Node itself
-            r = p1.radius
-            self.canvas.create_oval(
-                p1.x - r, p1.y - r, p1.x + r, p1.y + r,
-                fill="white", outline="", tags="network"
-            )
+        start = self.scheduler.begin()
+        # 1. Move Particles & redraw the network (pooled items or one raster image)
+        if self.field is not None:
+            segments = self.field.step()
+            self.renderer.draw(segments, self.field.keys, self.field.nodes())
+            if self.worker is not None:
+                self.worker.release()
             
         # Keep text on top
         self.canvas.tag_raise("ui")
@@ -204,9 +997,211 @@ class FocusNetworkApp(ctk.CTk):
                 q_idx = int(elapsed // 15) % len(self.quotes)
                 self.canvas.itemconfigure(self.txt_quote, text=self.quotes[q_idx])
 
-        self.after(30, self.animate)
+        # Flush the canvas redraw here so it counts towards the frame cost
+        self.update_idletasks()
+        focused = self.tk.call("focus") != "" # Empty when another application has focus
+        delay = self.scheduler.end(start, focused)
+        if self.field is not None:
+            count = self.scheduler.tune(len(self.field))
+            if count != len(self.field):
+                self.field.resize(count)
+            if self.canvas.itemcget(self.txt_stats, "state") == "normal":
+                text = self.scheduler.text(len(self.field))
+                if self.worker is not None:
+                    text += "\n" + self.worker.text()
+                self.canvas.itemconfigure(self.txt_stats, text=text)
+        self.after_id = self.after(delay, self.animate)
+
+def bench_pairs(counts=(60, 500, 2000, 5000), frames=20, w=1920, h=1080):
+    """
+    Headless: pair tests and per-frame time (move + pair search + color) for both searches.
+    """
+    for n in counts:
+        for name, search in (("all-pairs", find_pairs_brute), ("grid", find_pairs_grid)):
+            random.seed(n)
+            particles = [Particle(w, h) for _ in range(n)]
+            # The all-pairs scan takes seconds per frame at the top end
+            frames_run = 2 if search is find_pairs_brute and n > 2000 else frames
+            start = time.perf_counter()
+            for _ in range(frames_run):
+                for p in particles:
+                    p.move()
+                pairs, tests = search(particles)
+                for p1, p2, dist in pairs:
+                    line_color(dist)
+            ms = (time.perf_counter() - start) * 1000 / frames_run
+            print(f"N={n:>5} {name:>9}: {tests:>10,} tests {len(pairs):>7,} lines {ms:9.2f} ms/frame")
+        if np is not None:
+            field = NumpyParticleField(n, w, h, seed=n)
+            start = time.perf_counter()
+            for _ in range(frames):
+                segments = field.step()
+            ms = (time.perf_counter() - start) * 1000 / frames
+            lines = sum(len(group) for group in segments)
+            print(f"N={n:>5} {'numpy':>9}: {field.tests:>10,} tests {lines:>7,} lines {ms:9.2f} ms/frame")
+
+def bench_suite(counts=(60, 250, 1000, 2500, 5000, 10000, 20000), frames=10, w=1920, h=1080,
+                out=BENCH_OUT, frame_limit=5.0):
+    """
+    Headless sweep of every engine over particle counts, timing the three phases of a frame
+    (simulate, pair search, segment building) separately. "screen" keeps a w x h field, so
+    connections grow with N^2; "density" grows the field to keep PARTICLE_COUNT's density
+    at w x h, where only the all-pairs scan stays quadratic. An engine is skipped for larger
+    counts in a layout once one of its frames takes more than frame_limit seconds.
+    """
+    engines = [("all-pairs", lambda n, fw, fh: ParticleField(n, fw, fh, find_pairs_brute)),
+               ("grid", ParticleField)]
+    if np is not None:
+        engines.append(("numpy", lambda n, fw, fh: NumpyParticleField(n, fw, fh, seed=n)))
+    columns = ("engine", "layout", "n", "width", "height", "frames", "simulate_ms", "pairs_ms",
+               "segments_ms", "total_ms", "tests", "lines")
+    with open(out, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for layout in ("screen", "density"):
+            too_slow = set()
+            for n in counts:
+                scale = math.sqrt(n / PARTICLE_COUNT) if layout == "density" else 1
+                fw, fh = int(w * scale), int(h * scale)
+                for name, engine in engines:
+                    if name in too_slow:
+                        continue
+                    random.seed(n)
+                    field = engine(n, fw, fh)
+                    phases = [0.0, 0.0, 0.0]
+                    done = 0
+                    while done < frames:
+                        t0 = time.perf_counter()
+                        field.move()
+                        t1 = time.perf_counter()
+                        pairs = field.pairs()
+                        t2 = time.perf_counter()
+                        segments = field.build_segments(pairs)
+                        t3 = time.perf_counter()
+                        phases[0] += t1 - t0
+                        phases[1] += t2 - t1
+                        phases[2] += t3 - t2
+                        done += 1
+                        if t3 - t0 > frame_limit:
+                            too_slow.add(name)
+                            break
+                    simulate, search, build = (1000 * t / done for t in phases)
+                    lines = sum(len(group) for group in segments)
+                    writer.writerow((name, layout, n, fw, fh, done, f"{simulate:.3f}", f"{search:.3f}",
+                                     f"{build:.3f}", f"{simulate + search + build:.3f}", field.tests, lines))
+                    f.flush()
+                    print(f"{layout:>7} N={n:>6} {name:>9}: simulate {simulate:8.2f} pairs {search:9.2f} "
+                          f"segments {build:8.2f} ms/frame {lines:>9,} lines")
+    print(f"results written to {out}")
+
+def bench_canvas(counts=(60, 300, 1000), frames=60, w=1920, h=1080):
+    """
+    Tcl commands and time per frame (including Tk's redraw) for recreating the network
+    every frame versus the item pool. Needs a display.
+    """
+    root = tk.Tk()
+    canvas = tk.Canvas(root, width=w, height=h, bg=COLOR_BG, highlightthickness=0)
+    canvas.pack()
+    interpreter = canvas.tk
+    for n in counts:
+        for name in ("recreate", "pool"):
+            field = make_field(n, w, h, seed=n)
+            pool = CanvasItemPool(canvas)
+            counter = canvas.tk = CallCounter(interpreter)
+            start = time.perf_counter()
+            for _ in range(frames):
+                segments = field.step()
+                if name == "pool":
+                    pool.draw(segments, field.keys, field.nodes())
+                else:
+                    draw_recreate(canvas, segments, field.nodes())
+                root.update()
+            ms = (time.perf_counter() - start) * 1000 / frames
+            canvas.tk = interpreter
+            canvas.delete("all")
+            print(f"N={n:>5} {name:>8}: {counter.calls / frames:7.0f} Tcl calls "
+                  f"{counter.commands / frames:7.0f} commands {ms:8.2f} ms per frame")
+    root.destroy()
 
 # --- THE FIX IS HERE ---
-if __name__ == "_main_":
+def bench_worker(counts=(60, 1000, 3000, 10000), seconds=3, w=1920, h=1080):
+    """
+    Tk-side cost per frame with the simulation in-process vs in the worker (pin + views +
+    release), consuming at TARGET_FPS, plus the worker's frame statistics.
+    """
+    interval = 1 / TARGET_FPS
+    for n in counts:
+        field = make_field(n, w, h, seed=n)
+        start = time.perf_counter()
+        for _ in range(10):
+            field.step()
+        local_ms = (time.perf_counter() - start) * 100
+        worker = WorkerField(n, w, h, seed=n)
+        while worker.control[SEQ] == 0:
+            time.sleep(0.01)
+        ui = []
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            start = time.perf_counter()
+            worker.step()
+            worker.nodes()
+            worker.release()
+            ui.append(time.perf_counter() - start)
+            time.sleep(max(0, interval - ui[-1]))
+        st = worker.stats()
+        worker.close()
+        print(f"N={n:>6} in-process {local_ms:8.2f} ms  worker ui {1000 * sum(ui) / len(ui):6.3f} ms  "
+              + "  ".join(f"{k} {v}" for k, v in st.items()))
+
+def bench_backends(counts=(60, 300, 1000, 3000), frames=30, w=1920, h=1080):
+    """
+    Raster backend cost across particle counts: rasterizing alone (headless), then, if a
+    display is available, whole frames through Tk for the item pool and the raster image.
+    """
+    for n in counts:
+        field = make_field(n, w, h, seed=n)
+        for supersample in (1, 2):
+            raster = Rasterizer(w, h, supersample)
+            start = time.perf_counter()
+            for _ in range(frames):
+                raster.render(field.step(), field.nodes())
+            ms = (time.perf_counter() - start) * 1000 / frames
+            print(f"N={n:>5} rasterize{' aa' if supersample > 1 else '   '}: {ms:8.2f} ms/frame")
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        print("no display: skipping the Tk comparison")
+        return
+    canvas = tk.Canvas(root, width=w, height=h, bg=COLOR_BG, highlightthickness=0)
+    canvas.pack()
+    root.update()
+    for n in counts:
+        for name, renderer in (("canvas", CanvasItemPool(canvas)), ("raster", RasterRenderer(canvas))):
+            field = make_field(n, w, h, seed=n)
+            start = time.perf_counter()
+            for _ in range(frames):
+                renderer.draw(field.step(), field.keys, field.nodes())
+                root.update()
+            ms = (time.perf_counter() - start) * 1000 / frames
+            renderer.clear()
+            print(f"N={n:>5} {name:>12}: {ms:8.2f} ms/frame")
+    root.destroy()
+
+if __name__ == "__main__":
+    if "--bench" in sys.argv:
+        bench_pairs()
+        sys.exit()
+    if "--bench-suite" in sys.argv:
+        bench_suite()
+        sys.exit()
+    if "--bench-canvas" in sys.argv:
+        bench_canvas()
+        sys.exit()
+    if "--bench-backends" in sys.argv:
+        bench_backends()
+        sys.exit()
+    if "--bench-worker" in sys.argv:
+        bench_worker()
+        sys.exit()
     app = FocusNetworkApp()
     app.mainloop()
\ No newline at end of file
@@ -1,5 +1,7 @@
 import tkinter as tk
 from tkinter import scrolledtext
+import queue
+import threading
 import google.generativeai as genai
 
 # ---------------- CONFIG ----------------
@@ -7,7 +9,9 @@ API_KEY = "YOUR_API_KEY_HERE"   # <--- put your key here
 
 genai.configure(api_key=API_KEY)
 model = genai.GenerativeModel("gemini-2.0-flash")
-chat = model.start_chat(history=[])
+history = []  # finished turns only; a cancelled reply is not sent back to the model
+
+FLUSH_MS = 33  # streamed text reaches chat_box in at most ~30 inserts per second
 
 # ---------------- GUI ----------------
 root = tk.Tk()
@@ -66,17 +70,79 @@ send_btn = tk.Button(
     activebackground=BTN_HOVER,
     activeforeground="white",
     cursor="hand2",
-    command=lambda: send_message(),
+    command=lambda: send_or_stop(),
 )
 send_btn.pack(pady=(0, 20))
 
 send_btn.bind("<Enter>", on_enter)
 send_btn.bind("<Leave>", on_leave)
 
+def append(text):
+    chat_box.config(state="normal")
+    chat_box.insert(tk.END, text)
+    chat_box.config(state="disabled")
+    chat_box.see(tk.END)
+
+# ------------ Streaming replies (worker thread) -------------
+# The request runs off the Tk thread and puts each streamed chunk on the request's queue,
+# then None when it is over. Tk drains that queue every FLUSH_MS with one insert.
+current = None  # the in-flight request: {"cancel": Event, "chunks": Queue}
+
+def stream_reply(user_text, cancel, chunks):
+    turn = {"role": "user", "parts": [user_text]}
+    parts = []
+    try:
+        response = model.generate_content(history + [turn], stream=True)
+        for chunk in response:
+            if cancel.is_set():
+                break  # dropping the iterator closes the stream
+            parts.append(chunk.text)
+            chunks.put(parts[-1])
+        else:
+            if not cancel.is_set():
+                history.extend([turn, {"role": "model", "parts": ["".join(parts)]}])
+    except Exception as e:
+        chunks.put(f"(error) {e}")
+    chunks.put(None)
+
+def flush_reply(request):
+    if request is not current:
+        return  # cancelled; its thread finishes on its own
+    text = []
+    done = False
+    while True:
+        try:
+            chunk = request["chunks"].get_nowait()
+        except queue.Empty:
+            break
+        if chunk is None:
+            done = True
+            break
+        text.append(chunk)
+    if done:
+        text.append("\n\n")
+    if text:
+        append("".join(text))
+    if done:
+        finish_reply()
+    else:
+        root.after(FLUSH_MS, flush_reply, request)
+
+def finish_reply():
+    global current
+    current = None
+    send_btn.config(text="Send")
+
+def cancel_reply():
+    current["cancel"].set()
+    finish_reply()
+    append(" [cancelled]\n\n")
+
 # ------------ Function to send message -------------
 def send_message():
+    global current
     user_text = entry.get().strip()
-    if not user_text:
+    if not user_text or current is not None:
         return
     entry.delete(0, tk.END)
 
@@ -85,24 +151,20 @@ def send_message():
         root.destroy()
         return
 
-    # Show user message
-    chat_box.config(state="normal")
-    chat_box.insert(tk.END, f"You: {user_text}\n")
-    chat_box.config(state="disabled")
-    chat_box.see(tk.END)
-
-    # Gemini response
-    try:
-        response = chat.send_message(user_text)
-        bot_text = response.text
-    except Exception as e:
-        bot_text = f"(error) {e}"
-
-    # Show bot reply
-    chat_box.config(state="normal")
-    chat_box.insert(tk.END, f"Bot: {bot_text}\n\n")
-    chat_box.config(state="disabled")
-    chat_box.see(tk.END)
+    # Show user message, then stream the bot reply in after it
+    append(f"You: {user_text}\nBot: ")
+    current = {"cancel": threading.Event(), "chunks": queue.Queue()}
+    threading.Thread(
+        target=stream_reply, args=(user_text, current["cancel"], current["chunks"]), daemon=True
+    ).start()
+    send_btn.config(text="Stop")
+    root.after(FLUSH_MS, flush_reply, current)
+
+def send_or_stop():
+    if current is None:
+        send_message()
+    else:
+        cancel_reply()
 
 # Enter key sends message
 entry.bind("<Return>", lambda e: send_message())
@@ -5,6 +5,7 @@ Simple mingle/elimination mini-game prototype using pygame.
 Controls (when you are in a room with the human player):
   - Arrow keys or WASD: move
   - SPACE: attempt attack when colliding with another player
+  - F3: toggle the frame profiler overlay
 
 How it works:
   - Players are split into groups (rooms) for a round.
@@ -18,6 +19,23 @@ How it works:
 import pygame
 import random
 import math
+import time
+import argparse
+import tracemalloc
+import csv
+import os
+import sqlite3
+import itertools
+import multiprocessing
+import asyncio
+import socket
+import struct
+import pickle
+import sys
+import tempfile
+import threading
+from array import array
+from datetime import datetime
 from collections import deque
 
 # -------- CONFIGURATION --------
@@ -30,11 +48,260 @@ PLAYER_SPEED = 1.3
 HUT_CAPACITY = 3            # spots per hut
 HUT_COUNT = 1               # huts per room (increase to make it easier)
 AI_ATTACK_CHANCE = 0.02     # per update chance to attempt attack if near somebody
+AI_DECISION_INTERVAL = 6    # frames between an AI player's decisions (0 = decide every frame)
+AI_MAX_DECISION_INTERVAL = 30  # how far the frame governor may stretch it under load
+UPDATE_BUDGET_MS = 10.0     # per-frame room update budget when all rooms run at once
+FRAME_MS = 16.0             # dt passed to update() is measured in 16 ms frames
 # -------------------------------
 
 pygame.init()
 font = pygame.font.SysFont("Arial", 18)
 
+# -------- RENDER CACHE --------
+PLAYER_LABEL_COLOR = (0, 0, 0)
+HUT_LABEL_COLOR = (255, 255, 255)
+IN_HUT_COLOR = (50, 120, 200)
+BG_COLOR = (20, 20, 20)
+LOD_ROOM_COUNT = 12         # with more rooms than this on screen, static rooms draw as dots without labels
+LOD_DOT_RADIUS = 2
+
+def _prepare_surface(surf):
+    # match the display pixel format once a window exists (much faster blits)
+    return surf.convert_alpha() if pygame.display.get_surface() else surf
+
+# A text surface that is only re-rendered when its text changes
+class CachedText:
+    __slots__ = ("font", "color", "text", "surface")
+
+    def __init__(self, font, color):
+        self.font = font
+        self.color = color
+        self.text = None
+        self.surface = None
+
+    def render(self, text):
+        if text != self.text:
+            self.text = text
+            self.surface = self.font.render(text, True, self.color)
+        return self.surface
+
+# Labels packed into one atlas surface plus player circles pre-rasterized per color,
+# so drawing a player is two blits instead of draw.circle + font.render.
+class RenderCache:
+    def __init__(self, font, max_atlas_width=1024):
+        self.font = font
+        self.max_atlas_width = max_atlas_width
+        self.atlas = None
+        self.areas = {}    # (text, color) -> Rect inside atlas
+        self.loose = {}    # (text, color) -> Surface for labels missing from the atlas
+        self.circles = {}  # (color, radius) -> Surface
+
+    def build_atlas(self, entries):
+        # entries: iterable of (text, color); packed into shelves max_atlas_width wide
+        rendered = [(key, self.font.render(key[0], True, key[1])) for key in dict.fromkeys(entries)]
+        x = y = shelf_h = width = 0
+        placed = []
+        for key, surf in rendered:
+            w, h = surf.get_size()
+            if x and x + w > self.max_atlas_width:
+                x, y, shelf_h = 0, y + shelf_h, 0
+            placed.append((key, surf, pygame.Rect(x, y, w, h)))
+            x += w
+            width = max(width, x)
+            shelf_h = max(shelf_h, h)
+        atlas = pygame.Surface((max(1, width), max(1, y + shelf_h)), pygame.SRCALPHA)
+        for key, surf, area in placed:
+            # atlas starts fully transparent, so RGBA_MAX copies the label pixels as-is
+            atlas.blit(surf, area.topleft, special_flags=pygame.BLEND_RGBA_MAX)
+        self.atlas = _prepare_surface(atlas)
+        self.areas = {key: area for key, _, area in placed}
+        self.loose.clear()
+
+    def label(self, text, color):
+        # returns (source, area) ready for Surface.blit / Surface.blits
+        key = (text, color)
+        area = self.areas.get(key)
+        if area is not None:
+            return self.atlas, area
+        surf = self.loose.get(key)
+        if surf is None:
+            surf = self.loose[key] = self.font.render(text, True, color)
+        return surf, None
+
+    def circle(self, color, radius):
+        key = (color, radius)
+        surf = self.circles.get(key)
+        if surf is None:
+            surf = pygame.Surface((radius*2 + 1, radius*2 + 1), pygame.SRCALPHA)
+            pygame.draw.circle(surf, color, (radius, radius), radius)
+            surf = self.circles[key] = _prepare_surface(surf)
+        return surf
+
+def atlas_entries(players, hut_capacity=HUT_CAPACITY):
+    # every label Room.draw can ask for: player IDs and hut "n/capacity" counters
+    for p in players:
+        yield (str(p.id), PLAYER_LABEL_COLOR)
+    for n in range(hut_capacity + 1):
+        yield (f"{n}/{hut_capacity}", HUT_LABEL_COLOR)
+
+render_cache = RenderCache(font)
+# -------------------------------
+
+# -------- NAVIGATION --------
+NAV_CELL = 8                # flow-field cell size in pixels
+NAV_GOAL_RADIUS = 14        # cells this close to a hut center steer straight at it
+OBSTACLE_COLOR = (70, 70, 80)
+_NAV_STEPS = [(-1,-1), (0,-1), (1,-1), (-1,0), (1,0), (-1,1), (0,1), (1,1)]
+
+# Per-room flow field: BFS distance from every cell to the nearest hut with space
+# (or to any hut once all are full). It is rebuilt only when the set of full huts
+# changes, and each cell's direction is resolved once on first use, so AI steering
+# is a grid lookup per frame.
+class FlowField:
+    def __init__(self, rect, obstacles=(), cell=NAV_CELL):
+        x1, y1, x2, y2 = rect
+        self.x0, self.y0 = x1, y1
+        self.cell = cell
+        self.cols = cols = max(1, int((x2 - x1) // cell))
+        self.rows = rows = max(1, int((y2 - y1) // cell))
+        n = cols * rows
+        self.blocked = bytearray(n)
+        self.has_obstacles = bool(obstacles)
+        for ox1, oy1, ox2, oy2 in obstacles:
+            c1, r1 = self._cell(ox1, oy1)
+            c2, r2 = self._cell(ox2 - 1, oy2 - 1)
+            for r in range(r1, r2 + 1):
+                for c in range(c1, c2 + 1):
+                    self.blocked[r*cols + c] = 1
+        # static neighbour table: (index, unit dx, unit dy) per cell
+        self.neighbors = []
+        for i in range(n):
+            r, c = divmod(i, cols)
+            nbrs = []
+            for dc, dr in _NAV_STEPS:
+                nc, nr = c + dc, r + dr
+                if 0 <= nc < cols and 0 <= nr < rows:
+                    norm = math.hypot(dc, dr)
+                    nbrs.append((nr*cols + nc, dc / norm, dr / norm))
+            self.neighbors.append(tuple(nbrs))
+        self.dist = [-1] * n
+        self.dirs = [(0.0, 0.0)] * n  # None = not resolved yet since the last rebuild
+        self.goal = [None] * n        # hut a distance-0 cell steers straight at
+        self.owner = [None] * n       # hut each cell's path ends at
+        self.key = None
+        self.rebuilds = 0
+
+    def _cell(self, x, y):
+        c = min(self.cols - 1, max(0, int((x - self.x0) // self.cell)))
+        r = min(self.rows - 1, max(0, int((y - self.y0) // self.cell)))
+        return c, r
+
+    def index(self, x, y):
+        c, r = self._cell(x, y)
+        return r*self.cols + c
+
+    def is_blocked(self, x, y):
+        return self.blocked[self.index(x, y)] == 1
+
+    def refresh(self, huts):
+        key = tuple(h.is_full() for h in huts)
+        if key != self.key:
+            self.key = key
+            free = [h for h, full in zip(huts, key) if not full]
+            self.rebuild(free or huts)
+
+    def rebuild(self, targets):
+        cols, cell = self.cols, self.cell
+        n = cols * self.rows
+        blocked = self.blocked
+        neighbors = self.neighbors
+        dist = [-1] * n
+        goal = [None] * n
+        owner = [None] * n
+        queue = deque()
+        reach = NAV_GOAL_RADIUS + cell
+        for h in targets:
+            c1, r1 = self._cell(h.x - reach, h.y - reach)
+            c2, r2 = self._cell(h.x + reach, h.y + reach)
+            for r in range(r1, r2 + 1):
+                for c in range(c1, c2 + 1):
+                    i = r*cols + c
+                    cx = self.x0 + (c + 0.5) * cell
+                    cy = self.y0 + (r + 0.5) * cell
+                    if dist[i] < 0 and not blocked[i] and math.hypot(cx - h.x, cy - h.y) <= NAV_GOAL_RADIUS:
+                        dist[i] = 0
+                        goal[i] = owner[i] = h
+                        queue.append(i)
+            i = self.index(h.x, h.y)  # a hut always owns the cell it sits in
+            if dist[i] < 0:
+                dist[i] = 0
+                goal[i] = owner[i] = h
+                queue.append(i)
+
+        while queue:
+            i = queue.popleft()
+            d = dist[i] + 1
+            for j, _, _ in neighbors[i]:
+                if dist[j] < 0 and not blocked[j]:
+                    dist[j] = d
+                    owner[j] = owner[i]
+                    queue.append(j)
+        if self.has_obstacles:
+            # escape routes: blocked cells get distances above every open cell, growing
+            # inwards, so a player pushed into an obstacle walks back out the short way
+            for i in range(n):
+                if blocked[i] and any(dist[j] >= 0 and not blocked[j] for j, _, _ in neighbors[i]):
+                    dist[i] = n
+                    queue.append(i)
+            while queue:
+                i = queue.popleft()
+                d = dist[i] + 1
+                for j, _, _ in neighbors[i]:
+                    if dist[j] < 0 and blocked[j]:
+                        dist[j] = d
+                        owner[j] = owner[i]
+                        queue.append(j)
+        self.dist, self.goal, self.owner = dist, goal, owner
+        self.dirs = [None] * n
+        self.rebuilds += 1
+
+    def _resolve(self, i):
+        # point at the lowest-distance neighbour; blocked and unreachable cells do the
+        # same so players pushed into them walk back out
+        dist = self.dist
+        best = dist[i] if dist[i] > 0 else len(dist)
+        step = (0.0, 0.0)
+        for j, ux, uy in self.neighbors[i]:
+            d = dist[j]
+            if 0 <= d < best:
+                best = d
+                step = (ux, uy)
+        self.dirs[i] = step
+        return step
+
+    def target(self, x, y):
+        # hut the field leads to from (x, y)
+        return self.owner[self.index(x, y)]
+
+    def direction(self, x, y):
+        # unit steering vector for a player standing at (x, y); index() inlined, this is per player per frame
+        c = int((x - self.x0) // self.cell)
+        r = int((y - self.y0) // self.cell)
+        c = 0 if c < 0 else (self.cols - 1 if c >= self.cols else c)
+        r = 0 if r < 0 else (self.rows - 1 if r >= self.rows else r)
+        i = r*self.cols + c
+        h = self.goal[i]
+        if h is not None:
+            dx = h.x - x
+            dy = h.y - y
+            dist = math.hypot(dx, dy)
+            if dist <= 2:
+                return (0.0, 0.0)
+            return (dx / dist, dy / dist)
+        d = self.dirs[i]
+        return d if d is not None else self._resolve(i)
+# -------------------------------
+
 # Simple Player class
 class Player:
     def __init__(self, pid, pos, is_human=False):
@@ -49,6 +316,11 @@ class Player:
         self.speed = PLAYER_SPEED if not is_human else PLAYER_SPEED * 1.2
         self.in_room = None  # reference to current Room
         self.last_attack_cooldown = 0
+        self.roster_index = -1  # slot in the Tournament roster (-1 when not entered)
+        self.heading = (0.0, 0.0)  # AIScheduler: direction kept between decisions
+        self.watching = None       # AIScheduler: hut this player is heading for
+        self.ai_phase = 0          # AIScheduler: frame slot of this player's decisions
+        self.keys = None           # per-player key map for networked humans (None = local keyboard)
 
     def pos(self):
         return (self.x, self.y)
@@ -69,13 +341,33 @@ class Player:
             if keys.get(pygame.K_DOWN) or keys.get(pygame.K_s): dy += 1
             if dx != 0 or dy != 0:
                 norm = math.hypot(dx, dy)
+                old_x, old_y = self.x, self.y
                 self.x += (dx / norm) * self.speed * dt
                 self.y += (dy / norm) * self.speed * dt
+                nav = self.in_room.nav
+                if nav is not None and nav.is_blocked(self.x, self.y):
+                    self.x, self.y = old_x, old_y
             # keep inside room bounds
             self.x = max(self.in_room.bounds[0]+10, min(self.in_room.bounds[2]-10, self.x))
             self.y = max(self.in_room.bounds[1]+10, min(self.in_room.bounds[3]-10, self.y))
             return
 
+        # AI behavior: follow the room's flow field towards the nearest hut with space
+        nav = self.in_room.nav
+        if nav is not None:
+            ux, uy = nav.direction(self.x, self.y)
+            self.x += ux * self.speed * dt
+            self.y += uy * self.speed * dt
+        else:
+            self.steer_to_target(dt)
+
+        # small randomness
+        if random.random() < 0.005:
+            self.x += (random.random()-0.5)*2
+            self.y += (random.random()-0.5)*2
+
+    def steer_to_target(self, dt):
+        # per-agent re-targeting (rooms without a flow field)
         # AI behavior: if has target hut, move toward it, otherwise pick nearest hut
         if self.target_hut is None or self.target_hut.is_full() and not self.target_hut.contains(self):
             # pick a hut that has space if any, else random hut
@@ -94,11 +386,6 @@ class Player:
             self.x += (dx / dist) * self.speed * dt
             self.y += (dy / dist) * self.speed * dt
 
-        # small randomness
-        if random.random() < 0.005:
-            self.x += (random.random()-0.5)*2
-            self.y += (random.random()-0.5)*2
-
 # Hut with limited spots
 class Hut:
     def __init__(self, x, y, capacity):
@@ -106,6 +393,11 @@ class Hut:
         self.y = y
         self.capacity = capacity
         self.occupants = []
+        self.listeners = []  # callables (event, hut, player) for "enter", "displaced", "full"
+
+    def _emit(self, event, player):
+        for listener in self.listeners:
+            listener(event, self, player)
 
     def is_full(self):
         return len(self.occupants) >= self.capacity
@@ -121,6 +413,9 @@ class Hut:
             self.occupants.append(player)
             player.in_hut = True
             player.target_hut = self
+            self._emit("enter", player)
+            if self.is_full():
+                self._emit("full", player)
             return True
         return False
 
@@ -136,6 +431,8 @@ class Hut:
         self.occupants.append(attacker)
         attacker.in_hut = True
         attacker.target_hut = self
+        self._emit("displaced", victim)
+        self._emit("enter", attacker)
         return victim
 
     def get_spot_position(self):
@@ -144,20 +441,128 @@ class Hut:
         jitter = 10
         return (self.x + random.uniform(-jitter, jitter), self.y + random.uniform(-jitter, jitter))
 
+# Runs AI decisions (re-target, enter a hut, roll an attack) every `interval` frames,
+# staggered so only 1/interval of the crowd decides per frame. Between decisions an
+# agent keeps moving along its last heading. Hut events wake just the agents concerned:
+# "enter" retires the player, "displaced" wakes the victim, "full" wakes those heading there.
+class AIScheduler:
+    def __init__(self, room, interval=AI_DECISION_INTERVAL, base_attack_chance=AI_ATTACK_CHANCE):
+        self.room = room
+        self.interval = max(1, interval)
+        # same expected attack rate as rolling base_attack_chance every frame
+        self.base_attack_chance = base_attack_chance
+        self.attack_chance = 1 - (1 - base_attack_chance) ** self.interval
+        self.buckets = [{} for _ in range(self.interval)]  # decision phase -> agents (dicts keep order)
+        self.active = {}    # agents outside huts, moved every frame
+        self.awake = {}     # agents that decide on the next tick regardless of phase
+        self.watchers = {}  # hut -> agents whose heading leads there
+        self.frame = 0
+        self.decisions = 0
+        for k, p in enumerate(p for p in room.players if not p.is_human):
+            p.ai_phase = k % self.interval
+            if p.alive and not p.in_hut:
+                self._activate(p)
+
+    def set_interval(self, interval):
+        # re-stagger the agents that are still deciding over the new number of phases
+        interval = max(1, interval)
+        if interval == self.interval:
+            return
+        agents = [p for bucket in self.buckets for p in bucket]
+        self.interval = interval
+        self.attack_chance = 1 - (1 - self.base_attack_chance) ** interval
+        self.buckets = [{} for _ in range(interval)]
+        for k, p in enumerate(agents):
+            p.ai_phase = k % interval
+            self.buckets[p.ai_phase][p] = None
+
+    def _activate(self, p):
+        self.active[p] = None
+        self.buckets[p.ai_phase][p] = None
+        self.awake[p] = None
+
+    def _retire(self, p):
+        self.active.pop(p, None)
+        self.buckets[p.ai_phase].pop(p, None)
+        self.awake.pop(p, None)
+        self._unwatch(p)
+
+    def _unwatch(self, p):
+        if p.watching is not None:
+            self.watchers.get(p.watching, {}).pop(p, None)
+            p.watching = None
+
+    def on_hut_event(self, event, hut, player):
+        if event == "full":
+            # wakes the agents heading there, whoever filled the hut (a human too)
+            for p in self.watchers.pop(hut, {}):
+                p.watching = None
+                self.awake[p] = None
+        elif player.is_human:
+            return  # humans are never scheduled
+        elif event == "enter":
+            self._retire(player)
+        elif event == "displaced":
+            self._activate(player)
+
+    def tick(self, dt):
+        due = self.buckets[self.frame % self.interval]
+        self.frame += 1
+        awake, self.awake = self.awake, {}
+        for p in awake:
+            self.decide(p)
+        for p in list(due):
+            if p not in awake:
+                self.decide(p)
+
+        for p in self.active:
+            hx, hy = p.heading
+            p.x += hx * p.speed * dt
+            p.y += hy * p.speed * dt
+
+    def decide(self, p):
+        if not p.alive or p.in_hut:
+            return
+        self.decisions += 1
+        room = self.room
+        room.try_huts(p, self.attack_chance)
+        if p.in_hut:
+            return  # the enter event already retired it
+
+        nav = room.nav
+        p.heading = nav.direction(p.x, p.y)
+        hut = nav.target(p.x, p.y)
+        if hut is not p.watching:
+            self._unwatch(p)
+            if hut is not None:
+                self.watchers.setdefault(hut, {})[p] = None
+                p.watching = hut
+
+        # small randomness (same per-frame odds as before, rolled once per decision)
+        if random.random() < 0.005 * self.interval:
+            p.x += (random.random()-0.5)*2
+            p.y += (random.random()-0.5)*2
+
 # A Room contains players and huts and runs a timed round
 class Room:
-    def __init__(self, id, players, rect, hut_count=1, hut_capacity=HUT_CAPACITY):
+    def __init__(self, id, players, rect, hut_count=1, hut_capacity=HUT_CAPACITY, obstacles=(), navigation=True,
+                 ai_interval=AI_DECISION_INTERVAL, ai_attack_chance=AI_ATTACK_CHANCE):
         self.id = id
         self.players = players  # list of Player objects
         for p in players:
             p.in_room = self
             p.in_hut = False
             p.target_hut = None
+            p.watching = None
+            p.heading = (0.0, 0.0)
         self.bounds = rect  # (x1,y1,x2,y2)
         self.huts = []
         self.elapsed = 0.0
         self.time_limit = ROUND_TIME
+        self.pending_dt = 0.0  # dt banked while a budgeted frame skipped this room
         self.active = True
+        self.title_text = CachedText(font, (200,200,200))
+        self.rect = pygame.Rect(rect[0], rect[1], rect[2]-rect[0], rect[3]-rect[1])
         # generate huts inside bounds
         cx = (rect[0]+rect[2]) / 2
         cy = (rect[1]+rect[3]) / 2
@@ -167,46 +572,49 @@ class Room:
             hx = cx + (i - (hut_count-1)/2) * (spacing + 60)
             hy = cy
             self.huts.append(Hut(hx, hy, hut_capacity))
+        self.obstacles = list(obstacles)  # (x1,y1,x2,y2) rects players walk around
+        self.nav = FlowField(rect, self.obstacles) if navigation else None
+        self.nav_dirty = True
+        self.humans = [p for p in players if p.is_human]
+        self.ai_attack_chance = ai_attack_chance
+        # throttled AI needs the flow field; ai_interval=0 keeps per-frame Player.update
+        self.ai = AIScheduler(self, ai_interval, ai_attack_chance) if navigation and ai_interval else None
+        for h in self.huts:
+            h.listeners.append(self.on_hut_event)
+
+    def on_hut_event(self, event, hut, player):
+        if event == "full":
+            self.nav_dirty = True  # the field only changes when a hut fills up
+        if self.ai is not None:
+            self.ai.on_hut_event(event, hut, player)
 
     def update(self, dt, keys):
         if not self.active:
             return
 
-        self.elapsed += dt
-        # update players
-        keys_state = pygame.key.get_pressed()
-        keys_map = {k: keys_state[k] for k in range(len(keys_state))}
-        for p in self.players:
-            p.update(dt, keys_map)
+        self.elapsed += dt * FRAME_MS / 1000.0  # dt is in frames, the timer in seconds
+        # update players (keys: the per-frame map from read_keys(); None when nobody is at the keyboard)
+        keys_map = keys if keys is not None else {}
+        if self.nav_dirty and self.nav is not None:
+            self.nav.refresh(self.huts)
+            self.nav_dirty = False
+
+        if self.ai is not None:
+            # humans every frame, AI through the scheduler (which does its own hut checks)
+            for p in self.humans:
+                p.update(dt, keys_map if p.keys is None else p.keys)
+            self.ai.tick(dt)
+            players = self.humans
+        else:
+            for p in self.players:
+                p.update(dt, keys_map if p.keys is None else p.keys)
+            players = self.players
 
         # simple collision checks: if a player is near a hut center, try to enter
-        for p in self.players:
+        for p in players:
             if not p.alive or p.in_hut:
                 continue
-            for h in self.huts:
-                if p.distance_to(h.x, h.y) < 18:
-                    entered = h.try_enter(p)
-                    if entered:
-                        # snap into hut center
-                        p.x, p.y = h.get_spot_position()
-                        break
-                    else:
-                        # hut was full; allow occasional attack attempts (AI or human)
-                        if p.is_human:
-                            # human can press SPACE to attack nearby occupant (handled externally)
-                            pass
-                        else:
-                            if random.random() < AI_ATTACK_CHANCE:
-                                # try to force replace
-                                victim = h.force_replace(p)
-                                if victim:
-                                    victim.alive = True  # victim is kicked out only (not dead yet)
-                                    # the victim is now out of hut, will try to move away
-                                    # slight random push
-                                    victim.x += random.choice([-20,20])
-                                    victim.y += random.choice([-20,20])
-                                    # attacker occupies
-                                    break
+            self.try_huts(p)
 
         # decrease alive players if time up
         if self.elapsed >= self.time_limit:
@@ -216,13 +624,78 @@ class Room:
                     p.alive = False
             self.active = False
 
-    def draw(self, surface):
+    def add_player(self, p):
+        # join a running round (networked humans)
+        p.in_room = self
+        p.in_hut = False
+        p.target_hut = None
+        p.alive = True
+        self.players.append(p)
+        if p.is_human:
+            self.humans.append(p)
+        elif self.ai is not None:
+            self.ai._activate(p)
+
+    def remove_player(self, p):
+        # leave a running round; frees the hut spot if it held one
+        for h in self.huts:
+            if p in h.occupants:
+                h.occupants.remove(p)
+                self.nav_dirty = True
+        p.in_hut = False
+        self.players.remove(p)
+        if p in self.humans:
+            self.humans.remove(p)
+        elif self.ai is not None:
+            self.ai._retire(p)
+
+    def try_huts(self, p, attack_chance=None):
+        if attack_chance is None:
+            attack_chance = self.ai_attack_chance
+        for h in self.huts:
+            if p.distance_to(h.x, h.y) < 18:
+                entered = h.try_enter(p)
+                if entered:
+                    # snap into hut center
+                    p.x, p.y = h.get_spot_position()
+                    break
+                else:
+                    # hut was full; allow occasional attack attempts (AI or human)
+                    if p.is_human:
+                        # human can press SPACE to attack nearby occupant (handled externally)
+                        pass
+                    else:
+                        if random.random() < attack_chance:
+                            # try to force replace
+                            victim = h.force_replace(p)
+                            if victim:
+                                victim.alive = True  # victim is kicked out only (not dead yet)
+                                # the victim is now out of hut, will try to move away
+                                # slight random push
+                                victim.x += random.choice([-20,20])
+                                victim.y += random.choice([-20,20])
+                                # attacker occupies
+                                break
+
+    def draw(self, surface, cache=None, lod=False, viewport=None):
         # draw room bounds
         x1,y1,x2,y2 = self.bounds
         pygame.draw.rect(surface, (40,40,40), (x1,y1,x2-x1,y2-y1), 2)
+        for ox1, oy1, ox2, oy2 in self.obstacles:
+            pygame.draw.rect(surface, OBSTACLE_COLOR, (ox1, oy1, ox2-ox1, oy2-oy1))
+        if lod:
+            self.draw_lod(surface, cache)
+            return
         # title
-        txt = font.render(f"Room {self.id}  Time left: {max(0,int(self.time_limit - self.elapsed))}s", True, (200,200,200))
+        title = f"Room {self.id}  Time left: {max(0,int(self.time_limit - self.elapsed))}s"
+        if cache is None:
+            txt = font.render(title, True, (200,200,200))
+        else:
+            txt = self.title_text.render(title)
         surface.blit(txt, (x1+6,y1+6))
+        if cache is not None:
+            self.draw_cached(surface, cache, viewport)
+            return
         # draw huts
         for h in self.huts:
             hw, hh = 40, 30
@@ -235,25 +708,93 @@ class Room:
                 continue
             col = p.color
             if p.in_hut:
-                col = (50, 120, 200)
+                col = IN_HUT_COLOR
             pygame.draw.circle(surface, col, (int(p.x), int(p.y)), p.radius)
             # show id small
             idtxt = font.render(str(p.id), True, (0,0,0))
             surface.blit(idtxt, (p.x - 6, p.y - 6))
 
-# Utility: split players into rooms (list of lists)
-def split_into_rooms(all_players, room_size):
-    players = all_players[:]
-    random.shuffle(players)
-    rooms = []
-    i = 0
-    rid = 1
-    while i < len(players):
-        group = players[i:i+room_size]
-        rooms.append((rid, group))
-        i += room_size
-        rid += 1
-    return rooms
+    def draw_cached(self, surface, cache, viewport=None):
+        # same picture as the uncached path, but every label and circle is a blit from the cache
+        if viewport is not None and not viewport.contains(self.rect):
+            # room is partly off screen: clip to the visible part and skip players outside it
+            visible = viewport.clip(self.rect)
+            if not visible.width or not visible.height:
+                return
+            old_clip = surface.get_clip()
+            surface.set_clip(visible)
+            self._draw_cached_players(surface, cache, visible.inflate(24, 24))
+            surface.set_clip(old_clip)
+        else:
+            self._draw_cached_players(surface, cache, None)
+
+    def _draw_cached_players(self, surface, cache, visible):
+        blits = []
+        for h in self.huts:
+            hw, hh = 40, 30
+            pygame.draw.rect(surface, (120, 80, 40), (h.x - hw//2, h.y - hh//2, hw, hh))
+            src, area = cache.label(f"{len(h.occupants)}/{h.capacity}", HUT_LABEL_COLOR)
+            blits.append((src, (h.x - 18, h.y - 8), area))
+        for p in self.players:
+            if not p.alive:
+                continue
+            if visible is not None and not visible.collidepoint(p.x, p.y):
+                continue
+            r = p.radius
+            col = IN_HUT_COLOR if p.in_hut else p.color
+            blits.append((cache.circle(col, r), (int(p.x) - r, int(p.y) - r)))
+            src, area = cache.label(str(p.id), PLAYER_LABEL_COLOR)
+            blits.append((src, (p.x - 6, p.y - 6), area))
+        surface.blits(blits, False)
+
+    def draw_lod(self, surface, cache):
+        # low detail for small tiles: hut boxes and player dots, no text
+        for h in self.huts:
+            pygame.draw.rect(surface, (120, 80, 40), (h.x - 10, h.y - 8, 20, 16))
+        r = LOD_DOT_RADIUS
+        surface.blits([(cache.circle(IN_HUT_COLOR if p.in_hut else p.color, r), (int(p.x) - r, int(p.y) - r))
+                       for p in self.players if p.alive], False)
+
+# Rooms that are not running are frozen, so they are drawn once into a screen-sized
+# layer and blitted each frame; only the active room is redrawn on top of it.
+class StaticRoomLayer:
+    def __init__(self, size):
+        self.surface = pygame.Surface(size)
+        if pygame.display.get_surface():
+            self.surface = self.surface.convert()
+        self.valid = False
+        self.redraws = 0
+
+    def invalidate(self):
+        self.valid = False
+
+    def draw(self, screen, rooms, active, cache, viewport):
+        if not self.valid:
+            lod = len(rooms) > LOD_ROOM_COUNT
+            self.surface.fill(BG_COLOR)
+            for ro in rooms:
+                if ro is not active and viewport.colliderect(ro.rect):
+                    ro.draw(self.surface, cache, lod=lod)
+            self.valid = True
+            self.redraws += 1
+        screen.blit(self.surface, (0, 0))
+
+# Utility: grid of room rects (x1,y1,x2,y2) that fits num_rooms on the screen.
+# Up to 3 columns as before; larger rounds get a grid matched to the screen aspect.
+def layout_rooms(num_rooms, width=SCREEN_W, height=SCREEN_H, margin=12):
+    num_rooms = max(1, num_rooms)
+    cols = min(max(3, math.ceil(math.sqrt(num_rooms * width / height))), num_rooms)
+    rows = max(1, math.ceil(num_rooms / cols))
+    room_w = (width - (cols+1)*margin) / cols
+    room_h = (height - (rows+1)*margin) / rows
+    rects = []
+    for idx in range(num_rooms):
+        col = idx % cols
+        row = idx // cols
+        x1 = int(margin + col*(room_w + margin))
+        y1 = int(margin + row*(room_h + margin))
+        rects.append((x1, y1, int(x1 + room_w), int(y1 + room_h)))
+    return rects
 
 # Setup players
 def create_players(num_players, human_id=None):
@@ -280,105 +821,1154 @@ def create_players(num_players, human_id=None):
         players[0].is_human = True
     return players
 
+# Lean per-player record for headless tournaments (no position / rendering state)
+class PlayerRecord:
+    __slots__ = ("id", "is_human", "alive", "roster_index")
+
+    def __init__(self, pid, is_human=False):
+        self.id = pid
+        self.is_human = is_human
+        self.alive = True
+        self.roster_index = -1
+
+def create_records(num_players, human_id=None):
+    records = [PlayerRecord(pid) for pid in range(1, num_players + 1)]
+    if human_id is not None and records:
+        human = records[random.randrange(num_players)]
+        human.id = human_id
+        human.is_human = True
+    return records
+
+# Tournament bookkeeping: index-based roster with O(1) swap-remove elimination.
+# Works with Player objects or PlayerRecords (anything with alive/roster_index).
+class Tournament:
+    def __init__(self, players, room_size=ROOM_SIZE):
+        self.roster = list(players)  # living players, in no particular order
+        for i, p in enumerate(self.roster):
+            p.roster_index = i
+        # player ids kept in roster order, so a checkpoint is a single buffer copy
+        self.ids = array("q", (p.id for p in self.roster))
+        self.human_id = next((p.id for p in self.roster if p.is_human), -1)
+        self.room_size = room_size
+        self.round_number = 1
+        self.total_eliminated = 0
+        self.stalled = False  # last round eliminated nobody (everyone fits in the huts)
+        self._pending = []    # eliminations are applied at end_round so rooms() stays valid
+        self.pending_ids = array("q")  # their ids, kept alongside so a mid-round checkpoint is a buffer copy too
+
+    def __len__(self):
+        return len(self.roster)
+
+    @property
+    def finished(self):
+        return len(self.roster) <= 1 or self.stalled
+
+    def room_count(self):
+        return math.ceil(len(self.roster) / self.room_size)
+
+    def rooms(self, shuffle=True):
+        # Streaming room assignment: an in-place Fisher-Yates shuffle that is only
+        # carried out one room ahead, so no copy of the roster is made per round.
+        # shuffle=False replays the current order (resuming a round from a checkpoint).
+        roster = self.roster
+        ids = self.ids
+        n = len(roster)
+        rid = 1
+        for start in range(0, n, self.room_size):
+            end = min(start + self.room_size, n)
+            if shuffle:
+                for i in range(start, end):
+                    j = random.randrange(i, n)
+                    a, b = roster[j], roster[i]
+                    roster[i], roster[j] = a, b
+                    a.roster_index = i
+                    b.roster_index = j
+                    ids[i], ids[j] = a.id, b.id
+            yield rid, roster[start:end]
+            rid += 1
+
+    def eliminate(self, player):
+        player.alive = False
+        if player.roster_index >= 0:
+            self._pending.append(player)
+            self.pending_ids.append(player.id)
+
+    def end_round(self):
+        roster = self.roster
+        ids = self.ids
+        removed = 0
+        for p in self._pending:
+            i = p.roster_index
+            if i < 0:
+                continue  # queued twice
+            last = roster.pop()
+            ids.pop()
+            if last is not p:
+                roster[i] = last
+                ids[i] = last.id
+                last.roster_index = i
+            p.roster_index = -1
+            removed += 1
+        self._pending.clear()
+        del self.pending_ids[:]
+        self.total_eliminated += removed
+        self.stalled = removed == 0
+        self.round_number += 1
+        return removed
+
+    def play_round(self, resolve):
+        # resolve(group) -> iterable of players eliminated in that room
+        for rid, group in self.rooms():
+            for p in resolve(group):
+                self.eliminate(p)
+        return self.end_round()
+
+    def snapshot(self, rooms_done=0):
+        # cheap copies only (runs on the game loop); Checkpointer encodes it elsewhere
+        return (self.round_number, rooms_done, self.room_size, self.human_id, self.total_eliminated,
+                self.stalled, self.ids.tobytes(), self.pending_ids.tobytes(), random.getstate())
+
+    @classmethod
+    def restore(cls, snapshot, make_player):
+        # make_player(pid, is_human) builds the player objects; returns (tournament, rooms_done)
+        (round_number, rooms_done, room_size, human_id, total_eliminated,
+         stalled, ids, pending, rng_state) = snapshot
+        tournament = cls((make_player(pid, pid == human_id) for pid in ids), room_size)
+        tournament.round_number = round_number
+        tournament.total_eliminated = total_eliminated
+        tournament.stalled = stalled
+        if pending:
+            by_id = {p.id: p for p in tournament.roster}
+            for pid in pending:
+                tournament.eliminate(by_id[pid])
+        random.setstate(rng_state)
+        return tournament, rooms_done
+
+# -------- CHECKPOINTS --------
+CHECKPOINT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mingle_checkpoint.bin")
+# magic, version, round, rooms done in that round, room size, human id, eliminated, stalled, roster size, pending size
+_CHECKPOINT = struct.Struct("<4sHIIIqqBII")
+
+def encode_checkpoint(snapshot):
+    (round_number, rooms_done, room_size, human_id, total_eliminated,
+     stalled, ids, pending, rng_state) = snapshot
+    head = _CHECKPOINT.pack(b"MGCK", 1, round_number, rooms_done, room_size, human_id, total_eliminated,
+                            int(stalled), len(ids) // 8, len(pending) // 8)
+    if sys.byteorder != "little":
+        ids, pending = _swapped(ids), _swapped(pending)
+    return head + ids + pending + pickle.dumps(rng_state, protocol=pickle.HIGHEST_PROTOCOL)
+
+def decode_checkpoint(data):
+    (magic, version, round_number, rooms_done, room_size, human_id, total_eliminated,
+     stalled, n_ids, n_pending) = _CHECKPOINT.unpack_from(data)
+    if magic != b"MGCK" or version != 1:
+        raise ValueError("not a mingle checkpoint")
+    off = _CHECKPOINT.size
+    ids = array("q", data[off:off + n_ids * 8])
+    off += n_ids * 8
+    pending = array("q", data[off:off + n_pending * 8])
+    off += n_pending * 8
+    if sys.byteorder != "little":
+        ids.byteswap()
+        pending.byteswap()
+    rng_state = pickle.loads(data[off:])
+    return (round_number, rooms_done, room_size, human_id, total_eliminated,
+            bool(stalled), ids, pending, rng_state)
+
+def _swapped(raw):
+    values = array("q", raw)
+    values.byteswap()
+    return values.tobytes()
+
+def load_checkpoint(path, make_player):
+    with open(path, "rb") as f:
+        return Tournament.restore(decode_checkpoint(f.read()), make_player)
+
+# Writes checkpoints on a background thread. save() only takes the snapshot; if the
+# writer is still busy, a newer snapshot replaces the waiting one (latest wins).
+class Checkpointer:
+    def __init__(self, path=CHECKPOINT_PATH):
+        self.path = path
+        self.saves = 0
+        self.writes = 0
+        self.last_capture_ms = 0.0
+        self._waiting = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, name="checkpoint-writer", daemon=True)
+        self._thread.start()
+
+    def save(self, tournament, rooms_done=0):
+        start = time.perf_counter_ns()
+        snapshot = tournament.snapshot(rooms_done)
+        with self._lock:
+            self._waiting = snapshot
+        self._wake.set()
+        self.saves += 1
+        self.last_capture_ms = (time.perf_counter_ns() - start) / 1e6
+
+    def _run(self):
+        while True:
+            if not self._stop:
+                self._wake.wait()
+            self._wake.clear()
+            with self._lock:
+                snapshot, self._waiting = self._waiting, None
+            if snapshot is None:
+                if self._stop:
+                    return
+                continue
+            tmp = self.path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(encode_checkpoint(snapshot))
+            os.replace(tmp, self.path)  # a crash mid-write leaves the previous checkpoint intact
+            self.writes += 1
+
+    def close(self):
+        # flush the last snapshot and stop the writer
+        self._stop = True
+        self._wake.set()
+        self._thread.join()
+
+# Headless room outcome: huts hold HUT_COUNT * HUT_CAPACITY players and everyone
+# else is eliminated. Groups come out of a uniform shuffle, so the first spots win.
+def resolve_room(group, hut_count=HUT_COUNT, hut_capacity=HUT_CAPACITY):
+    return group[hut_count * hut_capacity:]
+
+def run_headless(num_players, room_size=ROOM_SIZE, seed=None, checkpoint_path=None, resume=False, stop_at=None):
+    # stop_at=(round, rooms done) returns right after that checkpoint, as if the window was closed
+    if seed is not None:
+        random.seed(seed)
+    tracemalloc.start()
+    if resume:
+        tournament, rooms_done = load_checkpoint(checkpoint_path, PlayerRecord)
+        num_players = len(tournament)
+        print(f"Resumed round {tournament.round_number} with {num_players} players from {checkpoint_path}")
+        if rooms_done:
+            # finish the interrupted round with the rooms it already had
+            for rid, group in list(tournament.rooms(shuffle=False))[rooms_done:]:
+                for p in resolve_room(group):
+                    tournament.eliminate(p)
+            tournament.end_round()
+    else:
+        tournament = Tournament(create_records(num_players, human_id=HUMAN_PLAYER_ID), room_size)
+    mem_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    checkpointer = Checkpointer(checkpoint_path) if checkpoint_path else None
+
+    start = time.perf_counter()
+    while not tournament.finished:
+        round_number = tournament.round_number
+        rooms = tournament.room_count()
+        note = ""
+        if checkpointer:
+            # save between rooms as run_game does, so captures with pending eliminations are timed too
+            # the whole round is shuffled before the first save (as run_game does), so a
+            # resumed round replays exactly these rooms with rooms(shuffle=False)
+            captures = []
+            for rid, group in list(tournament.rooms()):
+                for p in resolve_room(group):
+                    tournament.eliminate(p)
+                checkpointer.save(tournament, rooms_done=rid)
+                captures.append(checkpointer.last_capture_ms)
+                if stop_at == (round_number, rid):
+                    checkpointer.close()
+                    print(f"Stopped after room {rid} of round {round_number}")
+                    return tournament
+            removed = tournament.end_round()
+            checkpointer.save(tournament)
+            captures.sort()
+            note = (f" (checkpoint {checkpointer.last_capture_ms:.3f} ms; mid-round p50 "
+                    f"{captures[len(captures) // 2]:.3f} p99 {captures[int(0.99 * (len(captures) - 1))]:.3f} "
+                    f"max {captures[-1]:.3f} ms)")
+        else:
+            removed = tournament.play_round(resolve_room)
+        print(f"Round {round_number}: {rooms} rooms, {removed} eliminated, {len(tournament)} left{note}")
+    elapsed = time.perf_counter() - start
+    if checkpointer:
+        checkpointer.close()
+
+    print(f"{num_players} players in {elapsed:.2f}s "
+          f"({mem_bytes / max(1, num_players):.0f} bytes/player, {mem_bytes / 1e6:.1f} MB roster)")
+    if len(tournament) == 1:
+        winner = tournament.roster[0]
+        print(f"Winner: Player {winner.id} {'(YOU)' if winner.is_human else ''}")
+    else:
+        print(f"No single winner: {len(tournament)} players share the huts")
+    return tournament
+
+def check_resume(num_players=10000, seed=1, stop_at=(1, 7)):
+    # Headless self-check: a run interrupted mid-round and resumed from its checkpoint
+    # must end with the same survivors as an uninterrupted run on the same seed.
+    expected = sorted(p.id for p in run_headless(num_players, seed=seed).roster)
+    path = os.path.join(tempfile.mkdtemp(), "mingle_check.bin")
+    run_headless(num_players, seed=seed, checkpoint_path=path, stop_at=stop_at)
+    resumed = sorted(p.id for p in run_headless(num_players, checkpoint_path=path, resume=True).roster)
+    os.remove(path)
+    ok = resumed == expected
+    print(f"uninterrupted {expected}, resumed {resumed}: {'OK' if ok else 'MISMATCH'}")
+    return ok
+
+# -------- PROFILER --------
+PROFILE_PHASES = ("events", "keys", "update", "draw", "flip")
+
+# Per-phase frame timing with perf_counter_ns. Keeps a rolling window per phase for
+# percentiles, shows them in an overlay (F3) and can append one CSV row per frame.
+# While disabled every call returns straight away.
+class FrameProfiler:
+    def __init__(self, window=240, csv_path=None):
+        self.samples = {phase: deque(maxlen=window) for phase in PROFILE_PHASES + ("frame",)}
+        self.overlay = False
+        self.csv_file = open(csv_path, "w", newline="") if csv_path else None
+        self.csv = None
+        if self.csv_file:
+            self.csv = csv.writer(self.csv_file)
+            self.csv.writerow(("frame",) + tuple(f"{phase}_ms" for phase in PROFILE_PHASES) + ("frame_ms",))
+        self.enabled = self.csv is not None
+        self.frame_no = 0
+        self.current = dict.fromkeys(PROFILE_PHASES, 0)
+        self._start = self._last = 0
+        self.lines = [CachedText(font, (255, 255, 120)) for _ in range(len(PROFILE_PHASES) + 2)]
+        self.text = []
+
+    def toggle_overlay(self):
+        self.overlay = not self.overlay
+        self.enabled = self.overlay or self.csv is not None
+        # F3 arrives mid-frame: drop that partial frame, timing restarts at the next begin()
+        self._start = 0
+
+    def begin(self):
+        if not self.enabled:
+            return
+        self._start = self._last = time.perf_counter_ns()
+        for phase in self.current:
+            self.current[phase] = 0
+
+    def mark(self, phase):
+        # charge the time since the previous mark to `phase`
+        if not self.enabled or not self._start:
+            return
+        now = time.perf_counter_ns()
+        self.current[phase] += now - self._last
+        self._last = now
+
+    def end(self):
+        if not self.enabled or not self._start:
+            return
+        total = self._last - self._start
+        self._start = 0
+        for phase, ns in self.current.items():
+            self.samples[phase].append(ns)
+        self.samples["frame"].append(total)
+        self.frame_no += 1
+        if self.csv:
+            self.csv.writerow([self.frame_no] + [f"{self.current[p] / 1e6:.4f}" for p in PROFILE_PHASES]
+                              + [f"{total / 1e6:.4f}"])
+        if self.overlay and self.frame_no % 30 == 1:
+            self.text = self.summary()
+
+    def percentiles(self, phase, qs=(0.5, 0.95, 0.99)):
+        data = sorted(self.samples[phase])
+        if not data:
+            return tuple(0.0 for _ in qs)
+        return tuple(data[min(len(data) - 1, int(q * len(data)))] / 1e6 for q in qs)
+
+    def summary(self):
+        rows = [f"{'phase':<7} {'p50':>6} {'p95':>6} {'p99':>6}  ms"]
+        for phase in PROFILE_PHASES + ("frame",):
+            p50, p95, p99 = self.percentiles(phase)
+            rows.append(f"{phase:<7} {p50:6.2f} {p95:6.2f} {p99:6.2f}")
+        return rows
+
+    def draw(self, screen):
+        if not self.overlay:
+            return
+        y = 8
+        for line, text in zip(self.lines, self.text):
+            surf = line.render(text)
+            screen.fill((0, 0, 0), (SCREEN_W - 250, y, 244, surf.get_height()))
+            screen.blit(surf, (SCREEN_W - 246, y))
+            y += 18
+
+    def close(self):
+        if self.csv_file:
+            self.csv_file.close()
+            self.csv_file = self.csv = None
+# -------------------------------
+
+# layout rooms in grid (try to fit) and create room objects for one round
+def build_rooms(rooms_data, **room_options):
+    room_objs = []
+    for (rid, group), rect in zip(rooms_data, layout_rooms(len(rooms_data))):
+        # initialize player positions randomly within rect
+        for p in group:
+            p.x = random.uniform(rect[0]+20, rect[2]-20)
+            p.y = random.uniform(rect[1]+20, rect[3]-20)
+            p.alive = True
+            p.in_hut = False
+            p.target_hut = None
+            p.in_room = None
+        room_options.setdefault("hut_count", HUT_COUNT)
+        room_options.setdefault("hut_capacity", HUT_CAPACITY)
+        room_objs.append(Room(rid, group, rect, **room_options))
+    return room_objs
+
+# Quit / SPACE handling shared by both round modes; returns False once the window is closed
+def poll_events(rooms, message_log, profiler=None):
+    running = True
+    for event in pygame.event.get():
+        if event.type == pygame.QUIT:
+            running = False
+        if event.type == pygame.KEYDOWN:
+            # human attack attempt: check collisions with others in same room
+            if event.key == pygame.K_SPACE:
+                for room in rooms:
+                    human_attack(room, message_log)
+            if event.key == pygame.K_F3 and profiler is not None:
+                profiler.toggle_overlay()
+    return running
+
+# Movement keys the human player reads. Built once per frame and shared by every room;
+# only these keys are copied (pygame 2 arrow key codes lie far outside get_pressed()'s length).
+MOVE_KEYS = (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN, pygame.K_a, pygame.K_d, pygame.K_w, pygame.K_s)
+
+def read_keys():
+    state = pygame.key.get_pressed()
+    return {k: state[k] for k in MOVE_KEYS}
+
+def human_attack(room, message_log):
+    # find human in this room
+    for p in room.humans:
+        victim = player_attack(room, p)
+        if victim:
+            # victim gets kicked out and marked alive but not in hut
+            message_log.append(f"You displaced player {victim.id}!")
+
+def player_attack(room, p):
+    if p.alive and not p.in_hut:
+        # try to attack nearby occupant in a hut
+        for h in room.huts:
+            if h.is_full() and p.distance_to(h.x, h.y) < 22:
+                victim = h.force_replace(p)
+                if victim:
+                    return victim
+    return None
+
+def draw_messages(screen, log_lines, message_log):
+    # show messages and info
+    y = SCREEN_H - 80
+    for line, m in zip(log_lines, message_log):
+        screen.blit(line.render(m), (10, y))
+        y += 18
+
+def finish_room(room, tournament, message_log):
+    # queue the players left outside the huts for elimination
+    # (room update already marked them alive=False; rooms not yet run are untouched)
+    for p in room.players:
+        if not p.alive:
+            tournament.eliminate(p)
+    message_log.append(f"Room {room.id} ended. Survivors: {sum(1 for p in room.players if p.alive)}")
+
+# Keeps frames inside the budget. When frames run long, AI decision intervals are
+# stretched first (cheaper AI, same frame rate); they are restored once frames have
+# stayed comfortably under budget for a while.
+class FrameGovernor:
+    def __init__(self, budget_ms=1000 / 60, base_interval=AI_DECISION_INTERVAL, max_interval=AI_MAX_DECISION_INTERVAL):
+        self.budget_ms = budget_ms
+        self.base_interval = max(1, base_interval)
+        self.max_interval = max(self.base_interval, max_interval)
+        self.interval = self.base_interval
+        self.over = 0
+        self.under = 0
+
+    def update(self, frame_ms, rooms):
+        if frame_ms > self.budget_ms:
+            self.over += 1
+            self.under = 0
+        elif frame_ms < self.budget_ms * 0.7:
+            self.under += 1
+            self.over = 0
+        if self.over >= 3 and self.interval < self.max_interval:
+            self.set_interval(self.interval + 1, rooms)
+        elif self.under >= 60 and self.interval > self.base_interval:
+            self.set_interval(self.interval - 1, rooms)
+
+    def set_interval(self, interval, rooms):
+        self.interval = interval
+        self.over = self.under = 0
+        for r in rooms:
+            if r.ai is not None:
+                r.ai.set_interval(interval)
+
+# Give each room its share of the frame: rooms are updated round-robin from `start`
+# until the update budget is spent; rooms not reached keep their dt banked and catch
+# up on the next frame. Returns where the next frame should start.
+def update_rooms_budgeted(rooms, dt, keys, start=0, budget_ms=UPDATE_BUDGET_MS):
+    for r in rooms:
+        r.pending_dt += dt
+    n = len(rooms)
+    deadline = time.perf_counter_ns() + int(budget_ms * 1e6)
+    for k in range(n):
+        room = rooms[(start + k) % n]
+        if room.active:
+            room.update(room.pending_dt, keys)
+        room.pending_dt = 0.0
+        if time.perf_counter_ns() >= deadline:
+            return (start + k + 1) % n
+    return start
+
+def play_round_concurrently(screen, clock, rooms, tournament, message_log, log_lines, governor, profiler):
+    round_number = tournament.round_number
+    message_log.append(f"Round {round_number} - {len(rooms)} rooms starting at once")
+    human_room = next((r for r in rooms if r.humans), None)
+    lod = len(rooms) > LOD_ROOM_COUNT
+    live = list(rooms)
+    start = 0
+    while live:
+        frame_start = time.perf_counter_ns()
+        dt = clock.tick(60) / FRAME_MS  # normalized delta
+        profiler.begin()
+        if not poll_events(live, message_log, profiler):
+            return False
+        profiler.mark("events")
+        keys = read_keys()
+        profiler.mark("keys")
+
+        start = update_rooms_budgeted(live, dt, keys, start)
+        for room in live:
+            if not room.active:
+                finish_room(room, tournament, message_log)
+        if any(not r.active for r in live):
+            live = [r for r in live if r.active]
+            start = 0
+        profiler.mark("update")
+
+        screen.fill(BG_COLOR)
+        for room in rooms:
+            room.draw(screen, render_cache, lod=lod and room is not human_room)
+        draw_messages(screen, log_lines, message_log)
+        profiler.draw(screen)
+        profiler.mark("draw")
+        pygame.display.flip()
+        profiler.mark("flip")
+        profiler.end()
+        governor.update((time.perf_counter_ns() - frame_start) / 1e6, rooms)
+    return True
+
+# -------- BALANCING SWEEPS --------
+# parameter grid for --sweep; every combination gets an equal share of the games
+SWEEP_GRID = {
+    "hut_capacity": [2, 3, 4],
+    "hut_count": [1, 2],
+    "attack_chance": [0.01, 0.02, 0.05],
+    "player_speed": [1.0, 1.3, 1.6],
+    "room_size": [8, 10],
+}
+SWEEP_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "disc.db")
+SWEEP_BATCH = 500           # games per executemany/commit
+SWEEP_DT = 2.0              # headless step in 16 ms frames (coarser than the 60 FPS game loop)
+
+# One full game with the real room simulation (AI only, no window).
+# Returns the tournament and the number of players left after each round.
+def simulate_game(num_players=NUM_PLAYERS, hut_capacity=HUT_CAPACITY, hut_count=HUT_COUNT,
+                  attack_chance=AI_ATTACK_CHANCE, player_speed=PLAYER_SPEED, room_size=ROOM_SIZE,
+                  seed=None, dt=SWEEP_DT):
+    if seed is not None:
+        random.seed(seed)
+    players = create_players(num_players)
+    for p in players:
+        p.speed = player_speed
+    tournament = Tournament(players, room_size)
+    curve = [len(tournament)]
+    while not tournament.finished:
+        rooms = build_rooms(list(tournament.rooms()), hut_count=hut_count, hut_capacity=hut_capacity,
+                            ai_attack_chance=attack_chance)
+        for room in rooms:
+            while room.active:
+                room.update(dt, None)
+            for p in room.players:
+                if not p.alive:
+                    tournament.eliminate(p)
+        tournament.end_round()
+        curve.append(len(tournament))
+    return tournament, curve
+
+def _sweep_game(job):
+    # worker: (game, seed, num_players, params) -> games row (without sweep_id)
+    game, seed, num_players, params = job
+    start = time.perf_counter()
+    tournament, curve = simulate_game(num_players, seed=seed, **params)
+    sim_ms = (time.perf_counter() - start) * 1000
+    winner = tournament.roster[0].id if len(tournament) == 1 else None
+    return (game, seed, num_players, params["hut_capacity"], params["hut_count"], params["attack_chance"],
+            params["player_speed"], params["room_size"], len(curve) - 1, len(tournament), winner,
+            int(tournament.stalled), sim_ms, ",".join(map(str, curve)))
+
+def open_sweep_db(db_path=SWEEP_DB):
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS sweeps (
+            id INTEGER PRIMARY KEY, started TEXT, games INTEGER, num_players INTEGER, grid TEXT);
+        CREATE TABLE IF NOT EXISTS games (
+            sweep_id INTEGER, game INTEGER, seed INTEGER, num_players INTEGER,
+            hut_capacity INTEGER, hut_count INTEGER, attack_chance REAL, player_speed REAL, room_size INTEGER,
+            rounds INTEGER, survivors INTEGER, winner INTEGER, stalled INTEGER, sim_ms REAL,
+            curve TEXT);  -- players left after each round, comma separated
+        CREATE INDEX IF NOT EXISTS games_sweep ON games (sweep_id);
+    """)
+    return conn
+
+def run_sweep(total_games, num_players=NUM_PLAYERS, grid=SWEEP_GRID, workers=None, seed=0, db_path=SWEEP_DB):
+    names = list(grid)
+    points = [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+    per_point = max(1, math.ceil(total_games / len(points)))
+    jobs = [(g, seed + g, num_players, params)
+            for g, params in enumerate(p for p in points for _ in range(per_point))]
+
+    conn = open_sweep_db(db_path)
+    sweep_id = conn.execute("INSERT INTO sweeps (started, games, num_players, grid) VALUES (?, ?, ?, ?)",
+                            (datetime.now().isoformat(timespec="seconds"), len(jobs), num_players, repr(grid))).lastrowid
+    conn.commit()
+    workers = workers or os.cpu_count() or 1
+    print(f"Sweep {sweep_id}: {len(points)} parameter sets x {per_point} games = {len(jobs)} games on {workers} processes")
+
+    insert = "INSERT INTO games VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+    batch = []
+    done = 0
+    start = time.perf_counter()
+    with multiprocessing.Pool(workers) as pool:
+        for row in pool.imap_unordered(_sweep_game, jobs, chunksize=8):
+            batch.append((sweep_id,) + row)
+            if len(batch) >= SWEEP_BATCH:
+                conn.executemany(insert, batch)
+                conn.commit()
+                done += len(batch)
+                batch.clear()
+                print(f"  {done}/{len(jobs)} games ({time.perf_counter() - start:.0f}s)")
+    if batch:
+        conn.executemany(insert, batch)
+        conn.commit()
+    conn.close()
+    print(f"{len(jobs)} games in {time.perf_counter() - start:.1f}s -> {db_path}")
+    summarize_sweep(sweep_id, db_path)
+    return sweep_id
+
+# Survival curves and win distributions per parameter set, aggregated with NumPy
+def summarize_sweep(sweep_id, db_path=SWEEP_DB, max_survivors=5):
+    try:
+        import numpy as np
+    except ImportError:
+        print("⚠ Sweep summary needs numpy (pip install numpy); raw results are in", db_path)
+        return None
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("""SELECT hut_capacity, hut_count, attack_chance, player_speed, room_size,
+                                  num_players, rounds, survivors, curve
+                           FROM games WHERE sweep_id = ?""", (sweep_id,)).fetchall()
+    conn.close()
+    if not rows:
+        print(f"Sweep {sweep_id} has no games")
+        return None
+
+    params = np.array([r[:5] for r in rows], dtype=float)
+    num_players = np.array([r[5] for r in rows], dtype=float)
+    rounds = np.array([r[6] for r in rows], dtype=float)
+    survivors = np.array([r[7] for r in rows], dtype=np.int64)
+    curves = [np.array(r[8].split(","), dtype=float) for r in rows]
+    lengths = np.array([len(c) for c in curves])
+    width = lengths.max()
+    padded = np.zeros((len(rows), width))
+    padded[np.arange(width) < lengths[:, None]] = np.concatenate(curves)
+    # games that ended early keep their final count for the remaining rounds
+    finals = padded[np.arange(len(rows)), lengths - 1]
+    padded = np.where(np.arange(width) < lengths[:, None], padded, finals[:, None])
+    alive_frac = padded / num_players[:, None]
+
+    groups, inverse = np.unique(params, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    counts = np.bincount(inverse, minlength=len(groups))
+    curve_mean = np.zeros((len(groups), width))
+    np.add.at(curve_mean, inverse, alive_frac)
+    curve_mean /= counts[:, None]
+    mean_rounds = np.bincount(inverse, weights=rounds, minlength=len(groups)) / counts
+    buckets = np.minimum(survivors, max_survivors)
+    wins = np.bincount(inverse * (max_survivors + 1) + buckets,
+                       minlength=len(groups) * (max_survivors + 1)).reshape(len(groups), -1) / counts[:, None]
+
+    header = "cap huts attack speed room | games rounds  P(win) | left after each round | final survivors 0..%d+" % max_survivors
+    print(header)
+    for g, (cap, huts, attack, speed, room) in enumerate(groups):
+        curve_txt = " ".join(f"{v:.2f}" for v in curve_mean[g][1:6])
+        dist_txt = " ".join(f"{v:.2f}" for v in wins[g])
+        print(f"{cap:3.0f} {huts:4.0f} {attack:6.3f} {speed:5.1f} {room:4.0f} | {counts[g]:5d} {mean_rounds[g]:6.2f} "
+              f"{wins[g][1]:7.2f} | {curve_txt:<24} | {dist_txt}")
+    return {"params": groups, "games": counts, "survival": curve_mean, "mean_rounds": mean_rounds, "survivors": wins}
+# -------------------------------
+
+# -------- NETWORK --------
+NET_HOST = "127.0.0.1"
+NET_PORT = 5556
+NET_TICK_RATE = 30          # authoritative simulation ticks (and snapshots) per second
+NET_QUANT = 4               # positions travel as int16 in 1/4 pixel units
+NET_MAX_BUFFER = 256 * 1024 # clients with more unsent data than this are dropped
+
+# input bits (client -> server)
+IN_LEFT, IN_RIGHT, IN_UP, IN_DOWN, IN_ATTACK = 1, 2, 4, 8, 16
+# player flags in snapshots; FL_GONE marks a player that left
+FL_ALIVE, FL_IN_HUT, FL_HUMAN, FL_GONE = 1, 2, 4, 128
+
+# every message is a 2-byte length followed by a payload whose first byte is its type
+_LEN = struct.Struct("<H")
+_WELCOME = struct.Struct("<cHhhhhB")  # b"W", your player id, room bounds, hut count
+_HUT = struct.Struct("<hhB")          # hut x, y, capacity
+_SNAP = struct.Struct("<cIHB")        # b"K" keyframe / b"D" delta, tick, tenths of a second left, hut count
+_PLAYER = struct.Struct("<HhhB")      # id, quantized x, y, flags
+_INPUT = struct.Struct("<cB")         # b"I", input bits
+
+def net_frame(payload):
+    return _LEN.pack(len(payload)) + payload
+
+def input_keys(bits):
+    # input bits -> the key map Player.update reads
+    return {pygame.K_LEFT: bits & IN_LEFT, pygame.K_RIGHT: bits & IN_RIGHT,
+            pygame.K_UP: bits & IN_UP, pygame.K_DOWN: bits & IN_DOWN}
+
+# Snapshots are delta-encoded against the previous tick: positions are quantized and
+# only players whose quantized state changed are sent. TCP delivers every delta in
+# order, so a client only needs one keyframe when it joins.
+class SnapshotEncoder:
+    def __init__(self):
+        self.tick = 0
+        self.last = {}  # id -> (qx, qy, flags) as of the previous tick
+
+    def _header(self, kind, room, count):
+        left = max(0, int((room.time_limit - room.elapsed) * 10))
+        head = _SNAP.pack(kind, self.tick, min(left, 0xFFFF), len(room.huts))
+        return head + bytes(min(255, len(h.occupants)) for h in room.huts) + _LEN.pack(count)
+
+    def delta(self, room):
+        # advances to the next tick; returns the framed delta message
+        self.tick += 1
+        q = NET_QUANT
+        current = {}
+        changed = []
+        last = self.last
+        for p in room.players:
+            flags = (FL_ALIVE if p.alive else 0) | (FL_IN_HUT if p.in_hut else 0) | (FL_HUMAN if p.is_human else 0)
+            state = (int(p.x * q), int(p.y * q), flags)
+            current[p.id] = state
+            if last.get(p.id) != state:
+                changed.append(_PLAYER.pack(p.id, *state))
+        for pid, (qx, qy, _) in last.items():
+            if pid not in current:
+                changed.append(_PLAYER.pack(pid, qx, qy, FL_GONE))
+        self.last = current
+        return net_frame(self._header(b"D", room, len(changed)) + b"".join(changed))
+
+    def keyframe(self, room):
+        # full state at the current tick (call after delta() for that tick)
+        body = b"".join(_PLAYER.pack(pid, *state) for pid, state in self.last.items())
+        return net_frame(self._header(b"K", room, len(self.last)) + body)
+
+# Client-side mirror of the room built from welcome + snapshot messages
+class SnapshotDecoder:
+    def __init__(self):
+        self.player_id = None
+        self.bounds = None
+        self.huts = []       # [x, y, capacity, occupants]
+        self.players = {}    # id -> (x, y, flags)
+        self.tick = 0
+        self.time_left = 0.0
+
+    def feed(self, payload):
+        kind = payload[:1]
+        if kind == b"W":
+            _, self.player_id, x1, y1, x2, y2, count = _WELCOME.unpack_from(payload)
+            self.bounds = (x1, y1, x2, y2)
+            self.huts = [list(_HUT.unpack_from(payload, _WELCOME.size + i * _HUT.size)) + [0] for i in range(count)]
+        elif kind in (b"K", b"D"):
+            _, self.tick, left, huts = _SNAP.unpack_from(payload)
+            self.time_left = left / 10
+            off = _SNAP.size
+            for h, occupants in zip(self.huts, payload[off:off + huts]):
+                h[3] = occupants
+            off += huts
+            (count,) = _LEN.unpack_from(payload, off)
+            off += _LEN.size
+            if kind == b"K":
+                self.players.clear()
+            q = NET_QUANT
+            for pid, qx, qy, flags in _PLAYER.iter_unpack(payload[off:off + count * _PLAYER.size]):
+                if flags == FL_GONE:
+                    self.players.pop(pid, None)
+                else:
+                    self.players[pid] = (qx / q, qy / q, flags)
+
+class NetClient:
+    __slots__ = ("player", "writer", "needs_keyframe", "bits", "attacks")
+
+    def __init__(self, player, writer):
+        self.player = player
+        self.writer = writer
+        self.needs_keyframe = True
+        self.bits = 0
+        self.attacks = 0
+
+# Authoritative server: one Room simulated at NET_TICK_RATE. Every TCP client controls
+# a human player and receives a keyframe on join, then one delta per tick.
+class GameServer:
+    def __init__(self, num_ai=ROOM_SIZE, tick_rate=NET_TICK_RATE):
+        self.num_ai = num_ai
+        self.tick_rate = tick_rate
+        self.rect = layout_rooms(1)[0]  # one room filling the screen, as build_rooms lays it out
+        self.clients = {}
+        self.next_id = 1000  # human ids; AI players are 1..num_ai
+        self.encoder = SnapshotEncoder()
+        self.tick_ns = deque(maxlen=100000)
+        self.late_ticks = 0
+        self.bytes_sent = 0
+        self.rounds = 0
+        self.room = None
+        self.new_round()
+
+    def new_round(self):
+        # everyone connected plays again, with a fresh set of AI players
+        players = [c.player for c in self.clients.values()] + create_players(self.num_ai)
+        self.rounds += 1
+        (self.room,) = build_rooms([(self.rounds, players)])
+
+    def welcome(self, player):
+        huts = self.room.huts
+        x1, y1, x2, y2 = self.rect
+        body = _WELCOME.pack(b"W", player.id, x1, y1, x2, y2, len(huts))
+        body += b"".join(_HUT.pack(int(h.x), int(h.y), h.capacity) for h in huts)
+        return net_frame(body)
+
+    async def handle_client(self, reader, writer):
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        player = Player(self.next_id, (0, 0), is_human=True)
+        self.next_id += 1
+        player.keys = input_keys(0)
+        x1, y1, x2, y2 = self.rect
+        player.x = random.uniform(x1 + 20, x2 - 20)
+        player.y = random.uniform(y1 + 20, y2 - 20)
+        self.room.add_player(player)
+        client = self.clients[writer] = NetClient(player, writer)
+        writer.write(self.welcome(player))
+        try:
+            while True:
+                (size,) = _LEN.unpack(await reader.readexactly(_LEN.size))
+                payload = await reader.readexactly(size)
+                if payload[:1] == b"I":
+                    self.apply_input(client, _INPUT.unpack(payload)[1])
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.drop(client)
+
+    def apply_input(self, client, bits):
+        p = client.player
+        p.keys = input_keys(bits)
+        # IN_ATTACK is a one-shot: the client sets it only in the message for a key press
+        if bits & IN_ATTACK and p.in_room is self.room:
+            client.attacks += 1
+            player_attack(self.room, p)
+        client.bits = bits & ~IN_ATTACK
+
+    def drop(self, client):
+        if self.clients.pop(client.writer, None) is None:
+            return
+        if client.player in self.room.players:
+            self.room.remove_player(client.player)
+        client.writer.close()
+
+    def step(self, dt):
+        room = self.room
+        room.update(dt, None)
+        if not room.active:
+            self.new_round()
+            for c in self.clients.values():
+                c.needs_keyframe = True
+            room = self.room
+        delta = self.encoder.delta(room)
+        keyframe = None
+        for c in list(self.clients.values()):
+            if c.writer.transport.get_write_buffer_size() > NET_MAX_BUFFER:
+                self.drop(c)  # too slow to keep up
+                continue
+            if c.needs_keyframe:
+                keyframe = keyframe or self.encoder.keyframe(room)
+                data = keyframe
+                c.needs_keyframe = False
+            else:
+                data = delta
+            c.writer.write(data)
+            self.bytes_sent += len(data)
+
+    async def run(self, host=NET_HOST, port=NET_PORT, duration=None, on_started=None):
+        server = await asyncio.start_server(self.handle_client, host, port)
+        loop = asyncio.get_running_loop()
+        interval = 1 / self.tick_rate
+        dt = 1000 / self.tick_rate / FRAME_MS  # update() takes dt in 16 ms frames
+        print(f"Mingle server on {host}:{port} at {self.tick_rate} Hz")
+        if on_started:
+            on_started()
+        start = next_tick = loop.time()
+        async with server:
+            while duration is None or loop.time() - start < duration:
+                t0 = time.perf_counter_ns()
+                self.step(dt)
+                self.tick_ns.append(time.perf_counter_ns() - t0)
+                next_tick += interval
+                delay = next_tick - loop.time()
+                if delay < 0:
+                    self.late_ticks += 1
+                    next_tick = loop.time()  # don't try to catch up with a burst of ticks
+                await asyncio.sleep(max(0.0, delay))
+        for c in list(self.clients.values()):
+            self.drop(c)
+
+def check_net_input():
+    # Server-side self-check: every input message carrying IN_ATTACK is one attack, even
+    # with no other change in between (two SPACE presses while standing still)
+    server = GameServer(num_ai=0)
+    player = Player(server.next_id, (0, 0), is_human=True)
+    server.room.add_player(player)
+    client = NetClient(player, None)
+    for bits in (IN_ATTACK, IN_ATTACK, IN_LEFT, IN_LEFT | IN_ATTACK, IN_LEFT):
+        server.apply_input(client, bits)
+    ok = client.attacks == 3
+    print(f"3 attack presses -> {client.attacks} attacks: {'OK' if ok else 'MISMATCH'}")
+    return ok
+
+def run_server(host=NET_HOST, port=NET_PORT, num_ai=ROOM_SIZE):
+    try:
+        asyncio.run(GameServer(num_ai).run(host, port))
+    except KeyboardInterrupt:
+        pass
+
+# pygame client: sends input bits when they change, draws the decoded snapshots
+def run_client(host=NET_HOST, port=NET_PORT):
+    sock = socket.create_connection((host, port))
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setblocking(False)
+    screen = pygame.display.set_mode((SCREEN_W, SCREEN_H))
+    pygame.display.set_caption("Mingle Elimination Prototype (network)")
+    clock = pygame.time.Clock()
+    state = SnapshotDecoder()
+    buf = bytearray()
+    title = CachedText(font, (200,200,200))
+    sent_bits = 0
+    running = True
+    while running:
+        clock.tick(60)
+        attack = 0
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
+                attack = IN_ATTACK
+
+        try:
+            data = sock.recv(65536)
+            if not data:
+                break  # server closed the connection
+            buf += data
+        except BlockingIOError:
+            pass
+        while len(buf) >= _LEN.size:
+            (size,) = _LEN.unpack_from(buf)
+            if len(buf) < _LEN.size + size:
+                break
+            state.feed(bytes(buf[_LEN.size:_LEN.size + size]))
+            del buf[:_LEN.size + size]
+
+        keys = read_keys()
+        bits = ((IN_LEFT if keys[pygame.K_LEFT] or keys[pygame.K_a] else 0)
+                | (IN_RIGHT if keys[pygame.K_RIGHT] or keys[pygame.K_d] else 0)
+                | (IN_UP if keys[pygame.K_UP] or keys[pygame.K_w] else 0)
+                | (IN_DOWN if keys[pygame.K_DOWN] or keys[pygame.K_s] else 0) | attack)
+        if bits != sent_bits:
+            try:
+                sock.send(net_frame(_INPUT.pack(b"I", bits)))
+                sent_bits = bits & ~IN_ATTACK
+            except BlockingIOError:
+                pass
+
+        screen.fill(BG_COLOR)
+        if state.bounds:
+            x1, y1, x2, y2 = state.bounds
+            pygame.draw.rect(screen, (40,40,40), (x1, y1, x2-x1, y2-y1), 2)
+            screen.blit(title.render(f"Tick {state.tick}  Time left: {int(state.time_left)}s"), (x1+6, y1+6))
+            blits = []
+            for hx, hy, capacity, occupants in state.huts:
+                pygame.draw.rect(screen, (120, 80, 40), (hx - 20, hy - 15, 40, 30))
+                src, area = render_cache.label(f"{occupants}/{capacity}", HUT_LABEL_COLOR)
+                blits.append((src, (hx - 18, hy - 8), area))
+            for pid, (x, y, flags) in state.players.items():
+                if not flags & FL_ALIVE:
+                    continue
+                if flags & FL_IN_HUT:
+                    col = IN_HUT_COLOR
+                elif pid == state.player_id:
+                    col = (255, 220, 0)
+                else:
+                    col = (200, 40, 40) if flags & FL_HUMAN else (0, 180, 0)
+                blits.append((render_cache.circle(col, 8), (int(x) - 8, int(y) - 8)))
+                src, area = render_cache.label(str(pid), PLAYER_LABEL_COLOR)
+                blits.append((src, (x - 6, y - 6), area))
+            screen.blits(blits, False)
+        pygame.display.flip()
+    sock.close()
+    pygame.quit()
+
+# Simulated clients for the network benchmark: connect, send random input at 10 Hz,
+# read and decode every snapshot. Runs in its own process so the server keeps its core.
+async def _simulated_clients(host, port, count, seconds):
+    loop = asyncio.get_running_loop()
+    received = [0, 0]  # bytes, messages
+
+    async def client(i):
+        rng = random.Random(i)
+        reader, writer = await asyncio.open_connection(host, port)
+        state = SnapshotDecoder()
+        end = loop.time() + seconds
+
+        async def send_inputs():
+            while True:
+                writer.write(net_frame(_INPUT.pack(b"I", rng.getrandbits(4) | (IN_ATTACK if rng.random() < 0.05 else 0))))
+                await asyncio.sleep(0.1)
+
+        sender = asyncio.create_task(send_inputs())
+        try:
+            while loop.time() < end:
+                (size,) = _LEN.unpack(await reader.readexactly(_LEN.size))
+                state.feed(await reader.readexactly(size))
+                received[0] += _LEN.size + size
+                received[1] += 1
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            sender.cancel()
+            writer.close()
+
+    await asyncio.gather(*(client(i) for i in range(count)))
+    return received
+
+def _simulated_client_process(host, port, count, seconds, results):
+    results.put(asyncio.run(_simulated_clients(host, port, count, seconds)))
+
+def bench_net(num_clients=100, seconds=10.0, num_ai=0, host=NET_HOST, port=NET_PORT):
+    server = GameServer(num_ai=num_ai)
+    results = multiprocessing.Queue()
+    clients = multiprocessing.Process(target=_simulated_client_process,
+                                      args=(host, port, num_clients, seconds, results))
+    ticks_before = []
+
+    def start_clients():
+        clients.start()
+        ticks_before.append(time.perf_counter())
+
+    asyncio.run(server.run(host, port, duration=seconds + 1.0, on_started=start_clients))
+    wall = time.perf_counter() - ticks_before[0]
+    received, messages = results.get()
+    clients.join()
+
+    ticks = sorted(server.tick_ns)
+    p50 = ticks[len(ticks) // 2] / 1e6
+    p99 = ticks[min(len(ticks) - 1, int(len(ticks) * 0.99))] / 1e6
+    print(f"{num_clients} clients, {num_ai} AI, {len(ticks) / wall:.1f} ticks/s (target {server.tick_rate}), "
+          f"{server.late_ticks} late ticks")
+    print(f"tick work p50 {p50:.2f} ms, p99 {p99:.2f} ms (budget {1000 / server.tick_rate:.1f} ms)")
+    print(f"server sent {server.bytes_sent / wall / 1024:.1f} KiB/s total, "
+          f"{server.bytes_sent / wall / max(1, num_clients) / 1024:.2f} KiB/s per client; "
+          f"clients decoded {messages} snapshots ({received / 1024:.0f} KiB)")
+# -------------------------------
+
 # Main game loop: conduct rounds until done
-def run_game():
+def run_game(concurrent=False, profile_csv=None, checkpoint_path=CHECKPOINT_PATH, resume=False):
     screen = pygame.display.set_mode((SCREEN_W, SCREEN_H))
     pygame.display.set_caption("Mingle Elimination Prototype")
     clock = pygame.time.Clock()
 
-    all_players = create_players(NUM_PLAYERS, human_id=HUMAN_PLAYER_ID)
-    round_number = 1
-
-    # We'll keep a queue of players who are still alive
-    survivors = [p for p in all_players if p.alive]
+    # The tournament keeps the roster of players who are still alive
+    rooms_done = 0  # rooms of the current round already played (when resuming mid-round)
+    if resume:
+        tournament, rooms_done = load_checkpoint(checkpoint_path, lambda pid, is_human: Player(pid, (0,0), is_human))
+    else:
+        tournament = Tournament(create_players(NUM_PLAYERS, human_id=HUMAN_PLAYER_ID), ROOM_SIZE)
+    all_players = list(tournament.roster)
+    render_cache.build_atlas(atlas_entries(all_players))
+    static_layer = StaticRoomLayer((SCREEN_W, SCREEN_H))
+    viewport = screen.get_rect()
+    # taken between rooms and rounds; the file is written on a background thread
+    checkpointer = Checkpointer(checkpoint_path) if checkpoint_path else None
 
     running = True
     message_log = deque(maxlen=6)
+    log_lines = [CachedText(font, (220,220,220)) for _ in range(message_log.maxlen)]
+    governor = FrameGovernor()
+    profiler = FrameProfiler(csv_path=profile_csv)
+
+    while running and not tournament.finished:
+        round_number = tournament.round_number
+        # split survivors into rooms (a resumed round keeps its rooms and skips the played ones)
+        if rooms_done:
+            rooms_data = list(tournament.rooms(shuffle=False))[rooms_done:]
+            rooms_done = 0
+        else:
+            rooms_data = list(tournament.rooms())
+        room_objs = build_rooms(rooms_data)
+
+        if concurrent:
+            # every room runs its timer at the same time
+            running = play_round_concurrently(screen, clock, room_objs, tournament, message_log, log_lines, governor, profiler)
+        else:
+            # run each room round sequentially
+            for room in room_objs:
+                message_log.append(f"Round {round_number} - Room {room.id} starting with {len(room.players)} players")
+                static_layer.invalidate()  # the room that just finished changed; the new active one leaves the layer
+                # run room until its timer expires
+                while room.active and running:
+                    dt = clock.tick(60) / FRAME_MS  # normalized delta
+                    profiler.begin()
+                    running = poll_events([room], message_log, profiler)
+                    profiler.mark("events")
+                    keys = read_keys()
+                    profiler.mark("keys")
 
-    while running and len(survivors) > 1:
-        # split survivors into rooms
-        rooms_data = split_into_rooms(survivors, ROOM_SIZE)
-        room_objs = []
-        # layout rooms in grid (try to fit)
-        cols = min(3, len(rooms_data))
-        rows = max(1, math.ceil(len(rooms_data) / cols))
-        margin = 12
-        room_w = (SCREEN_W - (cols+1)*margin) / cols
-        room_h = (SCREEN_H - (rows+1)*margin) / rows
-
-        # create room objects
-        for idx, (rid, group) in enumerate(rooms_data):
-            col = idx % cols
-            row = idx // cols
-            x1 = int(margin + col*(room_w + margin))
-            y1 = int(margin + row*(room_h + margin))
-            rect = (x1, y1, int(x1 + room_w), int(y1 + room_h))
-            # initialize player positions randomly within rect
-            for p in group:
-                p.x = random.uniform(rect[0]+20, rect[2]-20)
-                p.y = random.uniform(rect[1]+20, rect[3]-20)
-                p.alive = True
-                p.in_hut = False
-                p.target_hut = None
-                p.in_room = None
-            r = Room(rid, group, rect, hut_count=HUT_COUNT, hut_capacity=HUT_CAPACITY)
-            room_objs.append(r)
-
-        # run each room round sequentially (could be parallel but simpler sequential)
-        for room in room_objs:
-            message_log.append(f"Round {round_number} - Room {room.id} starting with {len(room.players)} players")
-            round_running = True
-            # run room until its timer expires
-            while room.active and running:
-                dt = clock.tick(60) / 16.0  # normalized delta
-                for event in pygame.event.get():
-                    if event.type == pygame.QUIT:
-                        running = False
-                    if event.type == pygame.KEYDOWN:
-                        # human attack attempt: check collisions with others in same room
-                        if event.key == pygame.K_SPACE:
-                            # find human in this room
-                            for p in room.players:
-                                if p.is_human and p.alive and not p.in_hut:
-                                    # try to attack nearby occupant in a hut
-                                    for h in room.huts:
-                                        if h.is_full() and p.distance_to(h.x, h.y) < 22:
-                                            victim = h.force_replace(p)
-                                            if victim:
-                                                # victim gets kicked out and marked alive but not in hut
-                                                message_log.append(f"You displaced player {victim.id}!")
-                                                break
-
-                keys = pygame.key.get_pressed()
-                screen.fill((20,20,20))
-
-                # update and draw room only (we render whole screen but focus on this room)
-                room.update(dt, keys)
-                # draw all rooms (but others are static until run)
-                for ro in room_objs:
-                    ro.draw(screen)
-
-                # show messages and info
-                y = SCREEN_H - 80
-                for m in message_log:
-                    screen.blit(font.render(m, True, (220,220,220)), (10, y))
-                    y += 18
-
-                pygame.display.flip()
-
-            # after this room finishes, evaluate survivors
-            survivors = [p for p in survivors if p.alive and (p in room.players and p.in_hut or p not in room.players and p.alive)]  # keep hut survivors in the room; others outside this room remain as they were
-            # NOTE: since we're running rooms sequentially, players not in this room stay for later rooms as they were.
-            # For simplicity, players who were in the room but not in huts have been marked alive=False in room update.
-            message_log.append(f"Room {room.id} ended. Survivors: {sum(1 for p in room.players if p.alive)}")
-        # after all rooms processed, recompute survivors globally
-        survivors = [p for p in survivors if p.alive]
-        round_number += 1
+                    # update and draw room only (we render whole screen but focus on this room)
+                    room.update(dt, keys)
+                    profiler.mark("update")
+                    # other rooms are static until run: blit them from the cached layer
+                    static_layer.draw(screen, room_objs, room, render_cache, viewport)
+                    room.draw(screen, render_cache, viewport=viewport)
+                    draw_messages(screen, log_lines, message_log)
+                    profiler.draw(screen)
+                    profiler.mark("draw")
+                    pygame.display.flip()
+                    profiler.mark("flip")
+                    profiler.end()
+
+                if not running:
+                    break
+                finish_room(room, tournament, message_log)
+                if checkpointer:
+                    checkpointer.save(tournament, rooms_done=room.id)
+        if not running:
+            break  # window closed mid-round: the last checkpoint still describes this round
+        # after all rooms processed, drop the eliminated players from the roster
+        tournament.end_round()
+        if checkpointer:
+            checkpointer.save(tournament)
         # short pause between rounds
         pygame.time.delay(800)
 
     # Game end display
     screen.fill((10,10,10))
+    survivors = tournament.roster
     if len(survivors) == 1:
         winner = survivors[0]
         txt = font.render(f"Winner: Player {winner.id} {'(YOU)' if winner.is_human else ''}", True, (255,255,0))
@@ -386,9 +1976,138 @@ def run_game():
         txt = font.render("No winner (everyone eliminated?)", True, (255,255,0))
     screen.blit(txt, (SCREEN_W//2 - 150, SCREEN_H//2 - 20))
     pygame.display.flip()
+    profiler.close()
+    if checkpointer:
+        checkpointer.close()
     # wait a bit then quit
     pygame.time.wait(5000)
     pygame.quit()
 
+# Measure Room.draw with per-frame font.render vs the render cache
+def bench_draw(num_players=500, frames=300):
+    screen = pygame.display.set_mode((SCREEN_W, SCREEN_H))
+    players = create_players(num_players)
+    for p in players:
+        p.x = random.uniform(20, SCREEN_W - 20)
+        p.y = random.uniform(20, SCREEN_H - 20)
+    room = Room(1, players, (0, 0, SCREEN_W, SCREEN_H), hut_count=HUT_COUNT, hut_capacity=HUT_CAPACITY)
+    render_cache.build_atlas(atlas_entries(players))
+
+    results = {}
+    for name, cache in (("font.render", None), ("render cache", render_cache)):
+        room.draw(screen, cache)  # warm up
+        start = time.perf_counter()
+        for _ in range(frames):
+            screen.fill((20,20,20))
+            room.draw(screen, cache)
+        results[name] = (time.perf_counter() - start) * 1000 / frames
+        print(f"{name:>12}: {results[name]:.3f} ms/frame ({num_players} players)")
+    print(f"speedup: {results['font.render'] / results['render cache']:.1f}x")
+    return results
+
+# Frame time with many rooms on screen: redraw every room vs the static layer + active room
+def bench_rooms(num_rooms=60, frames=300):
+    screen = pygame.display.set_mode((SCREEN_W, SCREEN_H))
+    viewport = screen.get_rect()
+    players = create_players(num_rooms * ROOM_SIZE)
+    render_cache.build_atlas(atlas_entries(players))
+    rooms = []
+    for rid, rect in enumerate(layout_rooms(num_rooms), 1):
+        group = players[(rid-1)*ROOM_SIZE:rid*ROOM_SIZE]
+        for p in group:
+            p.x = random.uniform(rect[0]+4, rect[2]-4)
+            p.y = random.uniform(rect[1]+4, rect[3]-4)
+        rooms.append(Room(rid, group, rect, hut_count=HUT_COUNT, hut_capacity=HUT_CAPACITY))
+    active = rooms[0]
+    layer = StaticRoomLayer((SCREEN_W, SCREEN_H))
+
+    def redraw_all():
+        screen.fill(BG_COLOR)
+        for ro in rooms:
+            ro.draw(screen, render_cache)
+
+    def static_layer():
+        layer.draw(screen, rooms, active, render_cache, viewport)
+        active.draw(screen, render_cache, viewport=viewport)
+
+    results = {}
+    for name, frame in (("redraw all", redraw_all), ("static layer", static_layer)):
+        frame()  # warm up (builds the layer)
+        start = time.perf_counter()
+        for _ in range(frames):
+            frame()
+        results[name] = (time.perf_counter() - start) * 1000 / frames
+        print(f"{name:>12}: {results[name]:.3f} ms/frame ({num_rooms} rooms, budget 16.7 ms)")
+    return results
+
+# Per-frame Room.update cost for a crowd: per-agent re-targeting, the flow field
+# polled every frame, and the flow field with throttled AI decisions
+def bench_ai(num_players=500, frames=300, obstacles=True):
+    rect = (0, 0, SCREEN_W, SCREEN_H)
+    walls = [(150, 200, 170, 420), (620, 180, 640, 400), (300, 120, 500, 140)] if obstacles else []
+    results = {}
+    modes = (("re-targeting", False, 0), ("flow field", True, 0),
+             (f"every {AI_DECISION_INTERVAL} fr", True, AI_DECISION_INTERVAL))
+    for name, navigation, interval in modes:
+        random.seed(1)
+        players = create_players(num_players)
+        for p in players:
+            p.x = random.uniform(20, SCREEN_W - 20)
+            p.y = random.uniform(20, SCREEN_H - 20)
+        room = Room(1, players, rect, hut_count=max(HUT_COUNT, 4), hut_capacity=HUT_CAPACITY,
+                    obstacles=walls if navigation else (), navigation=navigation, ai_interval=interval)
+        room.time_limit = float("inf")
+        start = time.perf_counter()
+        for _ in range(frames):
+            room.update(1.0, None)
+        results[name] = (time.perf_counter() - start) * 1000 / frames
+        rebuilds = f", {room.nav.rebuilds} field rebuilds" if room.nav else ""
+        decisions = f", {room.ai.decisions / frames:.0f} decisions/frame" if room.ai else ""
+        print(f"{name:>12}: {results[name]:.3f} ms/frame ({num_players} players{rebuilds}{decisions})")
+    return results
+
 if __name__ == "__main__":
-    run_game()
+    parser = argparse.ArgumentParser(description="Mingle elimination prototype")
+    parser.add_argument("--headless", action="store_true", help="run a whole tournament without a window")
+    parser.add_argument("--players", type=int, default=NUM_PLAYERS, help="number of players (headless)")
+    parser.add_argument("--seed", type=int, default=None, help="random seed (headless)")
+    parser.add_argument("--concurrent", action="store_true", help="run all rooms of a round at the same time")
+    parser.add_argument("--sweep", type=int, metavar="GAMES", help="run GAMES headless games over SWEEP_GRID and store them in disc.db")
+    parser.add_argument("--serve", action="store_true", help="run the authoritative network server (TCP, localhost)")
+    parser.add_argument("--connect", metavar="HOST:PORT", nargs="?", const=f"{NET_HOST}:{NET_PORT}", help="join a server as a network client")
+    parser.add_argument("--bench-net", type=int, metavar="N", help="server tick rate and bandwidth with N simulated clients")
+    parser.add_argument("--checkpoint", metavar="PATH", default=None, help=f"checkpoint file (default {os.path.basename(CHECKPOINT_PATH)}; headless only checkpoints when given)")
+    parser.add_argument("--resume", action="store_true", help="continue the tournament saved in the checkpoint file")
+    parser.add_argument("--check-net", action="store_true", help="check the server's handling of attack inputs")
+    parser.add_argument("--check-resume", action="store_true", help="check that a headless run resumed mid-round ends like an uninterrupted one")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes for --sweep (default: all cores)")
+    parser.add_argument("--profile-csv", metavar="PATH", help="write per-frame phase timings to a CSV file (F3 shows the overlay)")
+    parser.add_argument("--bench-draw", type=int, metavar="N", help="time Room.draw for N players, with and without the render cache")
+    parser.add_argument("--bench-rooms", type=int, metavar="N", help="time a frame with N rooms on screen, with and without the static room layer")
+    parser.add_argument("--bench-ai", type=int, metavar="N", help="time Room.update for N AI players, with and without the flow field")
+    args = parser.parse_args()
+    if args.check_resume:
+        sys.exit(0 if check_resume() else 1)
+    elif args.check_net:
+        sys.exit(0 if check_net_input() else 1)
+    elif args.headless:
+        run_headless(args.players, seed=args.seed, resume=args.resume,
+                     checkpoint_path=args.checkpoint or (CHECKPOINT_PATH if args.resume else None))
+    elif args.serve:
+        run_server()
+    elif args.connect:
+        host, _, port = args.connect.rpartition(":")
+        run_client(host or NET_HOST, int(port))
+    elif args.bench_net:
+        bench_net(args.bench_net)
+    elif args.sweep:
+        run_sweep(args.sweep, num_players=args.players, workers=args.workers, seed=args.seed or 0)
+    elif args.bench_draw:
+        bench_draw(args.bench_draw)
+    elif args.bench_rooms:
+        bench_rooms(args.bench_rooms)
+    elif args.bench_ai:
+        bench_ai(args.bench_ai)
+    else:
+        run_game(concurrent=args.concurrent, profile_csv=args.profile_csv,
+                 checkpoint_path=args.checkpoint or CHECKPOINT_PATH, resume=args.resume)